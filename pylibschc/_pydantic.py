@@ -6,7 +6,7 @@
 
 import enum
 
-import pydantic.json
+from pydantic_core import core_schema
 
 __author__ = "Martine S. Lenders"
 __copyright__ = "Copyright 2023 Freie Universität Berlin"
@@ -27,38 +27,58 @@ class EnumByName(enum.Enum):
     # Pydantic custom type which will validate an Enum reference by
     # name.
 
-    # Ugliness: we need to monkeypatch pydantic's jsonification of Enums
-    # pylint: disable=no-member
-    pydantic.json.ENCODERS_BY_TYPE[enum.Enum] = lambda e: e.name
-
     @classmethod
-    def __get_validators__(cls):
-        # yield our validator
-        yield cls._validate
+    def __get_pydantic_core_schema__(cls, source_type, handler):
+        # pylint: disable=unused-argument
+        # validate with our validator and serialize to JSON by name
+        return core_schema.no_info_plain_validator_function(
+            cls._validate,
+            serialization=core_schema.plain_serializer_function_ser_schema(
+                _encode_enum_by_name, when_used="json"
+            ),
+        )
 
     @classmethod
-    def __modify_schema__(cls, schema):
+    def __get_pydantic_json_schema__(cls, schema, handler):
         """Override pydantic using Enum.name for schema enum values"""
-        schema["enum"] = list(cls.__members__.keys())
+        # pylint: disable=unused-argument
+        return {"enum": list(cls.__members__.keys())}
+
+    @classmethod
+    def _members_by_name(cls):
+        # cls.__dict__ so every enum class gets its own lookup table
+        members = cls.__dict__.get("_members_by_casefold_name")
+        if members is None:
+            members = {
+                name.casefold(): member for name, member in cls.__members__.items()
+            }
+            cls._members_by_casefold_name = members
+        return members
 
     @classmethod
     def _validate(cls, value):
         """Validate enum reference, `value`.
 
         We check:
-          1. If it is in uppercase a member of this Enum
-          2. If we can find it by name.
+          1. If it is a member of this Enum
+          2. If we can find it by case-insensitive name.
         """
         # is the value an enum member?
-        if isinstance(value, enum.Enum) and value in cls:
+        if isinstance(value, cls):
             return value
 
         # not a member...look up by name
-        try:
-            return cls[value.upper()]
-        except KeyError as exc:
+        member = None
+        if isinstance(value, str):
+            member = cls._members_by_name().get(value.casefold())
+        if member is None:
             name = cls.__name__
             expected = list(cls.__members__.keys())
             raise ValueError(
                 f"{value} not found for enum {name}. Expected one of: {expected}"
-            ) from exc
+            )
+        return member
+
+
+def _encode_enum_by_name(member: EnumByName) -> str:
+    return member.name
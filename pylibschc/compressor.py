@@ -12,6 +12,7 @@ __author__ = "Martine S. Lenders"
 __copyright__ = "Copyright 2023 Freie Universität Berlin"
 __license__ = "GPLv3"
 __email__ = "m.lenders@fu-berlin.de"
+__all__ = ["CompressorDecompressor"]
 
 
 # pylint: disable=import-error
@@ -22,6 +23,8 @@ from .libschc import (
     Direction,
 )
 
+_DIR_BI = Direction.BI
+
 
 class CompressorDecompressor:
     """A Compressor/Decompressor.
@@ -29,6 +32,8 @@ class CompressorDecompressor:
     This wraps :class:`pylibschc.libschc.CompressorDecompressor` for a more pythonic
     usage."""
 
+    __slots__ = ("_compress", "_decompress", "_device", "_device_inner")
+
     _inner_cls = InnerCompressorDecompressor
     _inner = None
 
@@ -42,14 +47,35 @@ class CompressorDecompressor:
         """
         :param device: Device to be used for compression/decompression.
         :type device: :class:`pylibschc.device.Device`
-
-        .. py:attribute:: device
-           :type: pylibschc.device.Device
-
-           Device to be used for compression/decompression.
         """
+        self._compress = self._inner.compress
+        self._decompress = self._inner.decompress
         self.device = device
 
+    @property
+    def device(self) -> pylibschc.device.Device:
+        """Device to be used for compression/decompression."""
+        return self._device
+
+    @device.setter
+    def device(self, device: pylibschc.device.Device):
+        self._device = device
+        # resolve the libSCHC-internal device once and not on every packet
+        self._device_inner = device.__inner__
+
+    @staticmethod
+    def _as_bytes(data: typing.Union[bytes, BitArray]) -> bytes:
+        if isinstance(data, BitArray):
+            return data.buffer
+        if isinstance(data, bytes):
+            return data
+        raise TypeError(f"data ({data}) expected to be either bytes or BitArray")
+
+    @staticmethod
+    def _check_input_type(data: typing.Union[bytes, BitArray]):
+        if not isinstance(data, (BitArray, bytes)):
+            raise TypeError(f"data ({data}) expected to be either bytes or BitArray")
+
     def output(
         self, data: typing.Union[bytes, BitArray], direction: Direction
     ) -> typing.Tuple[CompressionResult, BitArray]:
@@ -67,15 +93,11 @@ class CompressorDecompressor:
             :class:`pylibschc.libschc.BitArray`
             ]
         """
-        if direction == Direction.BI:
+        if direction is _DIR_BI:
             raise ValueError("direction must be either UP or DOWN, not BI")
-        if isinstance(data, BitArray):
-            byts = data.buffer
-        elif isinstance(data, bytes):
-            byts = data
-        else:
-            raise TypeError(f"data ({data}) expected to be either bytes or BitArray")
-        return self._inner.compress(byts, self.device.__inner__, direction)
+        # pylint: disable=unidiomatic-typecheck
+        byts = data if type(data) is bytes else self._as_bytes(data)
+        return self._compress(byts, self._device_inner, direction)
 
     def input(self, data: typing.Union[bytes, BitArray], direction: Direction) -> bytes:
         """Decompress according to the compression rules of
@@ -88,12 +110,10 @@ class CompressorDecompressor:
         :return: The decompressed data.
         :rtype: :class:`bytes`
         """
-        if direction == Direction.BI:
+        if direction is _DIR_BI:
             raise ValueError("direction must be either UP or DOWN, not BI")
-        if isinstance(data, BitArray):
-            bit_array = data
-        elif isinstance(data, bytes):
-            bit_array = BitArray(data)
-        else:
-            raise TypeError(f"data ({data}) expected to be either bytes or BitArray")
-        return self._inner.decompress(bit_array, self.device.__inner__, direction)
+        # pylint: disable=unidiomatic-typecheck
+        if type(data) is not BitArray and type(data) is not bytes:
+            self._check_input_type(data)
+        # bytes are handed to libSCHC without copying them into a BitArray
+        return self._decompress(data, self._device_inner, direction)
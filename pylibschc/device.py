@@ -14,6 +14,7 @@ __author__ = "Martine S. Lenders"
 __copyright__ = "Copyright 2023 Freie Universität Berlin"
 __license__ = "GPLv3"
 __email__ = "m.lenders@fu-berlin.de"
+__all__ = ["Device"]
 
 
 class Device:  # pylint: disable=too-many-instance-attributes
@@ -25,39 +26,58 @@ class Device:  # pylint: disable=too-many-instance-attributes
 
     """
 
+    __slots__ = {
+        "_inner": None,
+        "mtu": "The maximum transmission unit of the link layer of the device.",
+        "duty_cycle_ms": "The duty cycle in milliseconds of the device.",
+        "_compression_rules": None,
+        "_fragmentation_rules": None,
+        "_uncompressed_rule": None,
+    }
+
     _devices = {}
+    # largest device_id in _devices (0 if empty)
+    _max_device_id = 0
 
     def __new__(cls, device_id: int, mtu: int, duty_cycle_ms: int):
         # pylint: disable=unused-argument
         if device_id <= 0:
             raise ValueError(f"device_id must be > 0 (was {device_id})")
         if device_id not in cls._devices:
-            cls._devices[device_id] = super().__new__(cls)
+            cls._add_device(device_id, super().__new__(cls))
         return cls._devices[device_id]
 
+    @classmethod
+    def _add_device(cls, device_id: int, device: Device):
+        # keep _devices sorted by device_id, so Device.iter() does not need to sort
+        cls._devices[device_id] = device
+        if device_id > cls._max_device_id:
+            # appended after all other devices, so _devices is still sorted
+            cls._max_device_id = device_id
+        else:
+            devices = sorted(cls._devices.items())
+            cls._devices.clear()
+            cls._devices.update(devices)
+
     def __init__(self, device_id: int, mtu: int, duty_cycle_ms: int):
         """
         :param device_id: The libSCHC-internal identifier of the device.
         :param mtu: The maximum transmission unit of the link layer of the device.
         :param duty_cycle_ms: The duty cycle in milliseconds of the device.
-
-        .. py:attribute:: mtu
-           :type: pylibschc.device.Device
-
-           The maximum transmission unit of the link layer of the device.
-
-
-        .. py:attribute:: duty_cycle_ms
-           :type: pylibschc.libschc.Direction
-
-           The duty cycle in milliseconds of the device.
         """
+        self.mtu = mtu
+        self.duty_cycle_ms = duty_cycle_ms
+        if hasattr(self, "_inner"):
+            # already initialized by a previous construction of this multiton, so keep
+            # the cached rules
+            return
         try:
             self._inner = libschc.Device.get(device_id)
         except KeyError:
             self._inner = libschc.Device(device_id)
-        self.mtu = mtu
-        self.duty_cycle_ms = duty_cycle_ms
+        # caches of the already validated rules, rebuilt from libSCHC when None. The
+        # setters store copies, so later changes to the caller's rules are only
+        # reflected when the rules are set again.
         self._compression_rules = None
         self._fragmentation_rules = None
         self._uncompressed_rule = None
@@ -72,6 +92,8 @@ class Device:  # pylint: disable=too-many-instance-attributes
             return
         device = cls._devices[device_id]
         del cls._devices[device_id]
+        if device_id == cls._max_device_id:
+            cls._max_device_id = max(cls._devices, default=0)
         # ensure everything is cleaned up
         device._inner.unregister()  # pylint: disable=protected-access
         del device._inner
@@ -83,21 +105,22 @@ class Device:  # pylint: disable=too-many-instance-attributes
 
         :param device_id: The libSCHC-internal identifier of the device.
         :type device_id: :py:class:`int`"""
+        device = cls._devices.get(device_id)
+        if device is not None:
+            return device
+        # try to recover from dangling state
         try:
-            return cls._devices[device_id]
-        except KeyError as exc:
-            # try to recover from dangling state
-            try:
-                cls._devices[device_id] = libschc.Device.get(device_id)
-                return cls._devices[device_id]  # pragma: no cover
-            except KeyError:
-                raise exc  # pylint: disable=raise-missing-from
+            cls._add_device(device_id, libschc.Device.get(device_id))
+            return cls._devices[device_id]  # pragma: no cover
+        except KeyError:
+            raise KeyError(device_id) from None
 
     @classmethod
     def iter(cls) -> typing.Generator[Device]:
-        """Iterates over all devices deployed in libSCHC."""
-        for _, device in sorted(cls._devices.items()):
-            yield device
+        """Iterates over all devices deployed in libSCHC, ordered by their
+        ``device_id``."""
+        # iterate over a snapshot, so devices may be deleted while iterating
+        yield from tuple(cls._devices.values())
 
     @property
     def __inner__(self):
@@ -113,19 +136,46 @@ class Device:  # pylint: disable=too-many-instance-attributes
         """
         if self._compression_rules is None:
             self._compression_rules = [
-                rules.CompressionRule(**r) for r in self._inner.compression_rules
+                self._construct_compression_rule(r)
+                for r in self._inner.compression_rules
             ]
         return self._compression_rules
 
+    @staticmethod
+    def _construct_compression_rule(rule: dict) -> rules.CompressionRule:
+        # the libSCHC context can only hold what the C types allow, so skip pydantic
+        # validation when converting it back. model_construct() does not build
+        # sub-models, so the layer rules need to be constructed separately.
+        for layer in ("ipv6_rule", "udp_rule", "coap_rule"):
+            if layer in rule:
+                rule[layer] = [
+                    rules.CompressionRuleField.model_construct(**f) for f in rule[layer]
+                ]
+        return rules.CompressionRule.model_construct(**rule)
+
     @compression_rules.setter
     def compression_rules(
         self, compression_rules: typing.Optional[typing.List[rules.CompressionRule]]
     ):
         if compression_rules is None:
             del self._inner.compression_rules
+            self._compression_rules = None
         else:
-            self._inner.compression_rules = [r.dict() for r in compression_rules or []]
-        self._compression_rules = None
+            self._inner.compression_rules = [r.model_dump() for r in compression_rules]
+            # cache a copy of the validated rules, see __init__()
+            self._compression_rules = [
+                r.model_copy(deep=True) for r in compression_rules
+            ]
+
+    @property
+    def compression_rule_ids(self) -> typing.List[typing.Tuple[int, int]]:
+        """The rule IDs and rule ID sizes in bits of the compression rules of this
+        device.
+
+        Other than :attr:`Device.compression_rules`, this does not construct a
+        :class:`pylibschc.rules.CompressionRule` for every rule.
+        """
+        return self._inner.compression_rule_ids
 
     @property
     def device_id(self) -> int:
@@ -146,8 +196,11 @@ class Device:  # pylint: disable=too-many-instance-attributes
         to a list of fragmentation rules, the context will be updated accordingly.
         """
         if self._fragmentation_rules is None:
+            # the libSCHC context can only hold what the C types allow, so skip pydantic
+            # validation when converting it back
             self._fragmentation_rules = [
-                rules.FragmentationRule(**r) for r in self._inner.fragmentation_rules
+                rules.FragmentationRule.model_construct(**r)
+                for r in self._inner.fragmentation_rules
             ]
         return self._fragmentation_rules
 
@@ -157,9 +210,23 @@ class Device:  # pylint: disable=too-many-instance-attributes
     ):
         if fragmentation_rules is None:
             del self._inner.fragmentation_rules
+            self._fragmentation_rules = None
         else:
-            self._inner.fragmentation_rules = [r.dict() for r in fragmentation_rules]
-        self._fragmentation_rules = None
+            self._inner.fragmentation_rules = [
+                r.model_dump() for r in fragmentation_rules
+            ]
+            # cache a copy of the validated rules, see __init__()
+            self._fragmentation_rules = [r.model_copy() for r in fragmentation_rules]
+
+    @property
+    def fragmentation_rule_ids(self) -> typing.List[typing.Tuple[int, int]]:
+        """The rule IDs and rule ID sizes in bits of the fragmentation rules of this
+        device.
+
+        Other than :attr:`Device.fragmentation_rules`, this does not construct a
+        :class:`pylibschc.rules.FragmentationRule` for every rule.
+        """
+        return self._inner.fragmentation_rule_ids
 
     @property
     def uncompressed_rule(self) -> rules.UncompressedRule:
@@ -172,7 +239,9 @@ class Device:  # pylint: disable=too-many-instance-attributes
             self._uncompressed_rule is None
             and self._inner.uncompressed_rule_id_size_bits > 0
         ):
-            self._uncompressed_rule = rules.UncompressedRule(
+            # the libSCHC device can only hold what the C types allow, so skip pydantic
+            # validation when converting it back
+            self._uncompressed_rule = rules.UncompressedRule.model_construct(
                 rule_id=self._inner.uncompressed_rule_id,
                 rule_id_size_bits=self._inner.uncompressed_rule_id_size_bits,
             )
@@ -187,7 +256,9 @@ class Device:  # pylint: disable=too-many-instance-attributes
             self._inner.uncompressed_rule_id_size_bits = (
                 uncompressed_rule.rule_id_size_bits
             )
+            # cache a copy of the validated rule, see __init__()
+            self._uncompressed_rule = uncompressed_rule.model_copy()
         else:
             self._inner.uncompressed_rule_id = 0
             self._inner.uncompressed_rule_id_size_bits = 0
-        self._uncompressed_rule = None
+            self._uncompressed_rule = None
@@ -27,14 +27,62 @@ from .libschc import (
     TXState,
 )
 
+_ACK_HANDLED = ReassemblyStatus.ACK_HANDLED
+_COMPLETED = ReassemblyStatus.COMPLETED
+_NO_FRAGMENTATION = FragmentationResult.NO_FRAGMENTATION
+
+
+class _NoLock:
+    """Stand-in for the locks of a :py:class:`FragmenterReassembler` that is only used
+    from a single thread."""
+
+    __slots__ = ()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        # pylint: disable=unused-argument
+        return True
+
+    def release(self):
+        pass
+
+    def __enter__(self) -> bool:
+        return True
+
+    def __exit__(self, *args):
+        pass
+
+
+_NO_LOCK = _NoLock()
+
 
 class FragmenterReassembler(FragmenterOps):
     """A handler for fragmentation and reassembly.
 
     .. warning::
        If you fragment and reassemble a packet on the same device, you need two objects
-       of this type."""
-
+       of this type.
+
+    .. note::
+       Only one reception session is handled at a time. The connection is initialized
+       for reception with the current :py:attr:`FragmenterReassembler.device` by the
+       first :py:meth:`FragmenterReassembler.input` and kept for the following ones,
+       until libSCHC or a transmission resets it or the device is changed."""
+
+    __slots__ = {
+        "_conn": None,
+        "_conn_input": None,
+        "_device": None,
+        "_device_id": None,
+        "_init_tx": None,
+        "_mode": None,
+        "_mode_value": None,
+        "_real_end_tx": None,
+        "_rx_conn_lock": None,
+        "_rx_initialized": None,
+        "_tx_bit_array": None,
+        "_tx_conn_lock": None,
+        "_tx_held": None,
+    }
     _AWAITING_ACK_TXSTATES = {TXState.WAIT_BITMAP, TXState.RESEND}
     conn_cls = FragmentationConnection
 
@@ -49,6 +97,7 @@ class FragmenterReassembler(FragmenterOps):
             None,
         ] = None,
         remove_timer_entry: typing.Callable[[FragmentationConnection], None] = None,
+        single_threaded: bool = False,
     ):
         """
         :param device: The device to use for fragmentation/reassembly.
@@ -61,16 +110,10 @@ class FragmenterReassembler(FragmenterOps):
             needs to be scheduled.
         :param remove_timer_entry: (optional) Callback that is called when a timer task
             needs to be canceled. May be None.
-
-        .. py:attribute:: device
-           :type: pylibschc.device.Device
-
-           Device to be used for fragmentation/reassembly.
-
-        .. py:attribute:: mode
-           :type: pylibschc.libschc.FragmentationMode
-
-           The :class:`pylibschc.libschc.FragmentationMode` to use. May be None.
+        :param single_threaded: (optional) Do not lock the connection on transmission
+            and reception. Only set this to True if all methods of this object and all
+            callbacks, including timer tasks, are called from the same thread, e.g.,
+            within a single :py:mod:`asyncio` event loop.
 
         .. py:attribute:: end_rx
            :type: typing.Callable[[FragmentationConnection], None]
@@ -111,16 +154,52 @@ class FragmenterReassembler(FragmenterOps):
         self.device = device
         self.mode = mode
         self._conn = self.conn_cls(ops=self)
+        self._conn_input = self._conn.input
+        self._tx_bit_array = None
         self._init_tx = False
-        self._tx_conn_lock = threading.RLock()
-        self._rx_conn_lock = threading.Lock()
+        self._rx_initialized = False
+        self._tx_held = False
+        if single_threaded:
+            self._tx_conn_lock = self._rx_conn_lock = _NO_LOCK
+        else:
+            self._tx_conn_lock = threading.RLock()
+            self._rx_conn_lock = threading.Lock()
+
+    @property
+    def device(self) -> pylibschc.device.Device:
+        """Device to be used for fragmentation/reassembly."""
+        return self._device
+
+    @device.setter
+    def device(self, device: pylibschc.device.Device):
+        self._device = device
+        self._device_id = device.device_id
+        # the connection needs to be initialized with the new device for reception
+        self._rx_initialized = False
+
+    @property
+    def mode(self) -> FragmentationMode:
+        """The :class:`pylibschc.libschc.FragmentationMode` to use. May be None."""
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode: FragmentationMode):
+        self._mode = mode
+        self._mode_value = None if mode is None else mode.value
 
     def _tx_conn_release(self):
         self._init_tx = False
+        # resetting the connection also clears the device ID set by init_rx()
+        self._rx_initialized = False
         self._conn.reset()
+        if not self._tx_held:
+            # the lock is not held (anymore) for a transmission
+            return
+        self._tx_held = False
         try:
             self._tx_conn_lock.release()
         except RuntimeError:
+            # end_tx was called from a thread that does not own the lock
             pass
 
     def _end_fragmentation_tx(self, conn: FragmentationConnection):
@@ -149,6 +228,9 @@ class FragmenterReassembler(FragmenterOps):
     def input(self, data: typing.Union[bytes, BitArray]) -> ReassemblyStatus:
         """Handle incoming data.
 
+        Belongs to the single reception session of this object, see
+        :py:class:`FragmenterReassembler`.
+
         :param data: Either an ACK, a fragment, or an unfragmented packet.
         :return: Status of reassembly or an ACK was handled.
         :raises MemoryError: If memory for fragment reception could not be allocated.
@@ -161,24 +243,59 @@ class FragmenterReassembler(FragmenterOps):
             kept open, e.g., in case another ACK needs to be sent.
         """
         with self._rx_conn_lock:
-            if self.end_rx:
-                with self._tx_conn_lock:
-                    self._conn.init_rx(
-                        self.device.device_id,
-                        self.device.duty_cycle_ms,
-                    )
-            new_conn = self._conn.input(data)
-            if new_conn is None:
-                # duplicate ACK received
-                return ReassemblyStatus.COMPLETED  # pragma: no cover
-            if new_conn == self._conn:
-                return ReassemblyStatus.ACK_HANDLED
-            if not new_conn.fragmented:
-                if self.end_rx:  # pragma: no cover
-                    self.end_rx(new_conn)
-                new_conn.reset()
-                return ReassemblyStatus.COMPLETED
-            return new_conn.reassemble()
+            return self._input(data)
+
+    def input_batch(
+        self, frames: typing.Iterable[typing.Union[bytes, BitArray]]
+    ) -> typing.List[ReassemblyStatus]:
+        """Handle a burst of incoming data.
+
+        Equivalent to calling :py:meth:`FragmenterReassembler.input` for each element of
+        ``frames``, but the reception is only locked once for the whole burst.
+
+        :param frames: ACKs, fragments, or unfragmented packets in the order they were
+            received.
+        :raises MemoryError: If memory for fragment reception could not be allocated.
+        :return: The status for each element in ``frames``. See
+            :py:meth:`FragmenterReassembler.input` for the possible values.
+        """
+        with self._rx_conn_lock:
+            _input = self._input
+            return [_input(data) for data in frames]
+
+    def _init_rx(self):
+        with self._tx_conn_lock:
+            self._conn.init_rx(
+                self._device_id,
+                self._device.duty_cycle_ms,
+            )
+            self._rx_initialized = True
+
+    def _input(self, data: typing.Union[bytes, BitArray]) -> ReassemblyStatus:
+        # expects self._rx_conn_lock to be held
+        end_rx = self.end_rx
+        rx_initialized = self._rx_initialized
+        if end_rx and not rx_initialized:
+            self._init_rx()
+        new_conn = self._conn_input(data)
+        if new_conn is None and end_rx and rx_initialized:  # pragma: no cover
+            # libSCHC reset the connection without a callback since the last input,
+            # e.g., on a duplicate ACK or an abort. data was not handled, so initialize
+            # RX again and retry.
+            self._init_rx()
+            new_conn = self._conn_input(data)
+        if new_conn is None:  # pragma: no cover
+            # duplicate ACK received, the connection was reset by libSCHC
+            self._rx_initialized = False
+            return _COMPLETED
+        if new_conn is self._conn:
+            return _ACK_HANDLED
+        if not new_conn.fragmented:
+            if self.end_rx:  # pragma: no cover
+                self.end_rx(new_conn)
+            new_conn.reset()
+            return _COMPLETED
+        return new_conn.reassemble()
 
     def output(self, data: typing.Union[bytes, BitArray]) -> FragmentationResult:
         """Send ``data``, fragmented if necessary.
@@ -187,25 +304,39 @@ class FragmenterReassembler(FragmenterOps):
         :retval NO_FRAGMENTATION: If the packet was not fragmented.
         :retval SUCCESS: If the packet was fragmented.
         """
-        if isinstance(data, BitArray):
-            bit_array = data
-        else:
-            bit_array = BitArray(data)
         self._tx_conn_lock.acquire()  # pylint: disable=consider-using-with
-        self._init_tx = True
-        self._conn.init_tx(
-            self.device.device_id,
-            bit_array,
-            self.device.mtu,
-            self.device.duty_cycle_ms,
-            self.mode.value,
-        )
+        self._tx_held = True
         try:
+            # pylint: disable=unidiomatic-typecheck
+            if type(data) is bytes:
+                bit_array = self._tx_bit_array
+                if bit_array is None:
+                    bit_array = self._tx_bit_array = BitArray(data)
+                else:
+                    # reuse the BitArray of the last transmission. Its memory is only
+                    # re-allocated if data is larger than before.
+                    bit_array.buffer = data
+            elif isinstance(data, BitArray):
+                bit_array = data
+            else:
+                bit_array = BitArray(data)
+            self._init_tx = True
+            # init_tx() resets the connection, so init_rx() needs to be repeated
+            self._rx_initialized = False
+            device = self._device
+            self._conn.init_tx(
+                self._device_id,
+                bit_array,
+                device.mtu,
+                device.duty_cycle_ms,
+                self._mode_value,
+            )
             res = self._conn.fragment()
-            if res == FragmentationResult.NO_FRAGMENTATION:
+            if res is _NO_FRAGMENTATION:
                 self._end_fragmentation_tx(self._conn)
             return res
-        except Exception:  # pragma: no cover
+        except Exception:
+            # do not keep the connection locked if the transmission never started
             self._tx_conn_release()
             raise
 
@@ -214,8 +345,8 @@ class FragmenterReassembler(FragmenterOps):
 
         :param send: The send function for ``device``.
         """
-        return self.conn_cls.register_send(self.device.device_id, send)
+        return self.conn_cls.register_send(self._device_id, send)
 
     def unregister_send(self):
         """Remove a send function for the device of this fragmenter."""
-        return self.conn_cls.unregister_send(self.device.device_id)
+        return self.conn_cls.unregister_send(self._device_id)
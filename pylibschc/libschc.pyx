@@ -54,7 +54,6 @@
    The value is 8 multiplied with :c:macro:`BITMAP_SIZE_BYTES`.
 """
 
-import abc
 import enum
 import logging
 import typing
@@ -272,6 +271,10 @@ cdef char *_bit_array_ptr(BitArray bit_array):
     return <char *>bit_array._bit_array.ptr
 
 
+cdef uint32_t _bit_array_len(BitArray bit_array):
+    return bit_array._bit_array.len
+
+
 class HeaderFieldID(EnumByName):
     """Header field identifier for field descriptors of compression rules.
     Wraps the ``COAPO_fields`` and ``schc_header_fields`` types."""
@@ -680,6 +683,24 @@ cdef class Device:
             self._dev.compression_context = NULL
             self._dev.compression_rule_count = 0
 
+    property compression_rule_ids:
+        """
+        :type: list[tuple[int, int]]
+
+        The rule IDs and rule ID sizes in bits of the compression rules for this device,
+        read directly from the compression context of the wrapped
+        ``struct schc_device``. Cheaper than :attr:`Device.compression_rules`, when only
+        the rule IDs are needed.
+        """
+        def __get__(self) -> typing.Sequence[typing.Tuple[int, int]]:
+            cdef const clibschc.schc_compression_rule_t **ctx = (
+                <const clibschc.schc_compression_rule_t **>self._dev.compression_context
+            )
+            return [
+                (ctx[i].rule_id, ctx[i].rule_id_size_bits)
+                for i in range(self._dev.compression_rule_count)
+            ]
+
     property device_id:
         """
         :type: int
@@ -737,6 +758,24 @@ cdef class Device:
             self._dev.fragmentation_context = NULL
             self._dev.fragmentation_rule_count = 0
 
+    property fragmentation_rule_ids:
+        """
+        :type: list[tuple[int, int]]
+
+        The rule IDs and rule ID sizes in bits of the fragmentation rules for this
+        device, read directly from the fragmentation context of the wrapped
+        ``struct schc_device``. Cheaper than :attr:`Device.fragmentation_rules`, when
+        only the rule IDs are needed.
+        """
+        def __get__(self) -> typing.Sequence[typing.Tuple[int, int]]:
+            cdef const clibschc.schc_fragmentation_rule_t **ctx = (
+                <const clibschc.schc_fragmentation_rule_t **>self._dev.fragmentation_context
+            )
+            return [
+                (ctx[i].rule_id, ctx[i].rule_id_size_bits)
+                for i in range(self._dev.fragmentation_rule_count)
+            ]
+
     property uncompressed_rule_id:
         """
         :type: int
@@ -828,28 +867,45 @@ cdef class CompressorDecompressor:
         return CompressionResult.COMPRESSED, bit_arr
 
     @staticmethod
-    def decompress(bit_arr: BitArray, device: Device, dir: Direction) -> bytes:
-        """Decompress ``data`` for ``device`` in ``dir``.
-
-        :param data: The data to decompress.
-        :type data: :class:`bytes`
+    def decompress(
+        bit_arr: typing.Union[BitArray, bytes], device: Device, dir: Direction
+    ) -> bytes:
+        """Decompress ``bit_arr`` for ``device`` in ``dir``.
+
+        :param bit_arr: The data to decompress. :class:`bytes` are decompressed in
+            place, i.e., without copying them into a :class:`BitArray` first.
+        :type bit_arr: :class:`BitArray` or :class:`bytes`
         :param device: The device of which to use the compression context.
         :type device: :class:`Device`
-        :param dir: The direction ``data`` is sent in.
+        :param dir: The direction ``bit_arr`` is sent in.
         :type dir: :class:`Direction`
         :raise ValueError: When direction is :attr:`pylibschc.libschc.Direction.BI`.
         :return: The decompressed packet.
         :rtype: :class:`bytes`
         """
+        cdef clibschc.schc_bitarray_t bytes_bit_arr
+        cdef clibschc.schc_bitarray_t *c_bit_arr
+
         if <clibschc.direction>dir.value == <clibschc.direction>Direction.BI.value:
             raise ValueError("`dir` must be either UP or DOWN, not BI")
 
+        if isinstance(bit_arr, BitArray):
+            c_bit_arr = &(<BitArray>bit_arr)._bit_array
+        else:
+            # schc_decompress() only reads from the buffer, so it can point to the
+            # memory of the bytes object directly
+            bytes_bit_arr.ptr = <uint8_t *>(<char *>bit_arr)
+            bytes_bit_arr.offset = 0
+            bytes_bit_arr.padding = 0
+            bytes_bit_arr.len = len(bit_arr)
+            bytes_bit_arr.bit_len = len(bit_arr) * 8
+            c_bit_arr = &bytes_bit_arr
         buf = b"\0" * clibschc.MAX_MTU_LENGTH
         cdef uint16_t length = clibschc.schc_decompress(
-            &bit_arr._bit_array,
+            c_bit_arr,
             <uint8_t *>(<char *>buf),
             device.device_id,
-            bit_arr.length,
+            c_bit_arr.len,
             <clibschc.direction>dir.value
         )
         return buf[:length]
@@ -892,6 +948,11 @@ class FragmentationResult(enum.Enum):
     END = clibschc.SCHC_END
 
 
+# maps return values of schc_fragment() to their FragmentationResult without going
+# through the enum constructor for every packet
+_FRAGMENTATION_RESULTS = {res.value: res for res in FragmentationResult}
+
+
 class ReassemblyStatus(enum.Enum):
     """The state of reassembly after calling
     :py:meth:`FragmentationConnection.reassemble()`."""
@@ -902,8 +963,12 @@ class ReassemblyStatus(enum.Enum):
     ACK_HANDLED = 256
 
 
-class FragmenterOps(abc.ABC):
+cdef class FragmenterOps:
     """Operation callbacks for a :py:class:`FragmentationConnection`."""
+    cdef public object post_timer_task
+    cdef public object end_rx
+    cdef public object end_tx
+    cdef public object remove_timer_entry
     conn_cls = FragmentationConnection
 
     def __init__(  # pylint: disable=too-many-arguments
@@ -1317,7 +1382,11 @@ cdef class FragmentationConnection:
         :retval SUCCESS: If the packet was fragmented.
         :rtype: :py:class:`FragmentationResult`
         """
-        return FragmentationResult(self._fragment())
+        res = self._fragment()
+        try:
+            return _FRAGMENTATION_RESULTS[res]
+        except KeyError:  # pragma: no cover
+            return FragmentationResult(res)
 
     cdef FragmentationConnection _new_conn(self, clibschc.schc_fragmentation_t *conn):
         res = FragmentationConnection._outer_from_struct(conn)
@@ -1388,7 +1457,8 @@ cdef class FragmentationConnection:
         """
         try:
             if isinstance(buffer, BitArray):
-                return self._input(_bit_array_ptr(buffer), buffer.length)
+                return self._input(_bit_array_ptr(buffer), _bit_array_len(buffer))
+            # bytes are passed to libSCHC as is, without wrapping them in a BitArray
             return self._input(<char *>buffer, len(buffer))
         except Exception:
             raise
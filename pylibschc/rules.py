@@ -5,16 +5,17 @@
 """Representation and configuration of rules."""
 
 import argparse
+import io
 import ipaddress
-import struct
 import typing
 
-from pydantic import BaseModel as PydanticBaseModel  # pylint: disable=no-name-in-module
-from pydantic import (
+from pydantic import (  # pylint: disable=no-name-in-module
+    BaseModel,
+    Field,
     conbytes,
     conint,
     conlist,
-    validator,
+    field_validator,
 )
 
 import pylibschc.device
@@ -42,14 +43,126 @@ __email__ = "m.lenders@fu-berlin.de"
 
 
 # pylint: disable=too-many-lines
-class BaseModel(PydanticBaseModel):
-    """Overrides pydantic to default to case-insensitivity."""
 
-    # pylint: disable=too-few-public-methods
-    class Config:
-        """Config meta-class for :class:`BaseModel`."""
+# column-aligned names for c_schc_field_declaration(), the enums are fixed so they can
+# be padded once
+_C_FIELD = {
+    field: f"{field.name},{(16 - len(field.name)) * ' '}" for field in HeaderFieldID
+}
+_C_DIR = {dir_: f"{dir_.name},{(5 - len(dir_.name)) * ' '}" for dir_ in Direction}
+_C_MO = {mo: "&mo_MSB" if mo == MO.MSB else f"&mo_{mo.name.lower()}" for mo in MO}
+_C_MO_PADDED = {mo: f"{c_mo},{(15 - len(c_mo)) * ' '}" for mo, c_mo in _C_MO.items()}
+_C_ACTION = {cda: f"{cda.name}{(12 - len(cda.name)) * ' '}" for cda in CDA}
+
+# bits of the first byte that are beyond field_length, indexed by field_length % 8
+_HIGH_MASK = (0x00, 0xFE, 0xFC, 0xF8, 0xF0, 0xE0, 0xC0, 0x80)
+
+# the CompressionRule layer rule each header field belongs to
+_FIELD_LAYER_RULE = {
+    field: {"IP6": "ipv6_rule", "UDP": "udp_rule", "COAP": "coap_rule"}.get(
+        field.name.split("_", 1)[0]
+    )
+    for field in HeaderFieldID
+}
+
+# fields that may take an IPv6 address (prefix) as target_value
+_PREFIX_FIELDS = frozenset({HeaderFieldID.IP6_DEVPRE, HeaderFieldID.IP6_APPPRE})
+_ADDR_FIELDS = _PREFIX_FIELDS | {HeaderFieldID.IP6_DEVIID, HeaderFieldID.IP6_APPIID}
+
+# C hex literals of all byte values
+_HEX_PREFIXED = tuple(f"0x{byte:02x}" for byte in range(256))
+
+# templates for the C declarations of rules and devices, parsed only once
+_C_COMPRESSION_RULE_DECLARATION = (
+    "{{\n"
+    "    .rule_id = {rule_id}U,\n"
+    "    .rule_id_size_bits = {rule_id_size_bits}U,\n"
+    "#if USE_IP6\n"
+    "    .ipv6_rule = {ipv6_rule_ptr},\n"
+    "#endif\n"
+    "#if USE_UDP\n"
+    "    .udp_rule = {udp_rule_ptr},\n"
+    "#endif\n"
+    "#if USE_COAP\n"
+    "    .coap_rule = {coap_rule_ptr},\n"
+    "#endif\n"
+    "}}"
+).format
+_C_FRAGMENTATION_RULE_DECLARATION = (
+    "{{\n"
+    "    .rule_id = {rule_id}U,\n"
+    "    .rule_id_size_bits = {rule_id_size_bits}U,\n"
+    "    .mode = {mode},\n"
+    "    .dir = {dir},\n"
+    "    .FCN_SIZE = {FCN_SIZE:6d}U,    "
+    "/* FCN field size (N in RFC) */\n"
+    "    .MAX_WND_FCN = {MAX_WND_FCN:3d}U,    "
+    "/* Maximum fragments per window (WINDOW_SIZE in RFC) */\n"
+    "    .WINDOW_SIZE = {WINDOW_SIZE:3d}U,    "
+    "/* W field size (M in RFC) */\n"
+    "    .DTAG_SIZE = {DTAG_SIZE:5d}U     "
+    "/* DTAG field size (T in RFC) */\n"
+    "}}"
+).format
+# the schc_config.h values are fixed when libSCHC is built, so the start and end of the
+# C header never change
+_C_HEADER_PREAMBLE = f"""/*
+ * generated by pylibschc with schc_config.h
+ *
+ * ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+ * #define USE_IP6              1
+ * #define USE_UDP              1
+ * #define USE_COAP             1
+ * #define MAX_FIELD_LENGTH     {MAX_FIELD_LENGTH}
+ * #define IP6_FIELDS           {IP6_FIELDS}
+ * #define UDP_FIELDS           {UDP_FIELDS}
+ * #define COAP_FIELDS          {COAP_FIELDS}
+ * #define FCN_SIZE_BITS        {FCN_SIZE_BITS}
+ * #define DTAG_SIZE_BITS       {DTAG_SIZE_BITS}
+ * #define BITMAP_SIZE_BITS     {BITMAP_SIZE_BITS}
+ * ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+ */
+
+#ifndef RULES_RULE_CONFIG_H
+#define RULES_RULE_CONFIG_H
+
+#include "schc.h"
+
+#ifdef __cplusplus
+extern "C" {{
+#endif
+"""
+_C_HEADER_TRAILER = """
 
-        case_sensitive = False
+#ifdef __cplusplus
+}
+#endif
+
+#endif /* RULES_RULE_CONFIG_H */
+"""
+_C_DEVICE_DECLARATION = (
+    "{{\n"
+    "    .device_id = {device_id}U,\n"
+    "    .uncomp_rule_id = {uncomp_rule_id}U,\n"
+    "    .uncomp_rule_id_size_bits = {uncomp_rule_id_size_bits}U,\n"
+    "    .compression_rule_count = {compression_rules_count},\n"
+    "    .compression_context = {compression_rules_ptr},\n"
+    "    .fragmentation_rule_count = {fragmentation_rules_count},\n"
+    "    .fragmentation_context = {fragmentation_rules_ptr},\n"
+    "}}"
+).format
+
+
+def _content_key(value) -> typing.Hashable:
+    """Hashable representation of the content of a (list of) models, so that equal
+    rules can be looked up in a dictionary."""
+    if isinstance(value, BaseModel):
+        value = value.model_dump()
+    if isinstance(value, dict):
+        return tuple((key, _content_key(val)) for key, val in value.items())
+    if isinstance(value, list):
+        return tuple(_content_key(val) for val in value)
+    return value
 
 
 class BaseRule(BaseModel):
@@ -61,10 +174,11 @@ class BaseRule(BaseModel):
     rule_id_size_bits: conint(gt=0, le=32)
     """Size of Rule ID in bits. Must be 0 < :attr:`BaseRule.rule_id_size_bits` ≤ 32"""
 
-    @validator("rule_id_size_bits", allow_reuse=True)
+    @field_validator("rule_id_size_bits")
     @classmethod
-    def check_rule_id_size_bits(cls, value, values):
+    def check_rule_id_size_bits(cls, value, info):
         # pylint: disable=missing-function-docstring
+        values = info.data
         if values.get("rule_id", 1 << 32) >= (1 << value):
             raise ValueError(
                 f"rule_id={values.get('rule_id')} does not fit into "
@@ -93,7 +207,7 @@ class CompressionRuleField(BaseModel):
     """Matching operator for this field."""
     action: CDA
     """Compression/decompression action for this field."""
-    MO_param_length: conint(ge=0x00, le=0xFF) = 0
+    MO_param_length: conint(ge=0x00, le=0xFF) = Field(0, validate_default=True)
     """Parameter length for the matching operator (default: 0). Must be
     0 ≤ :attr:`CompressionRuleField.MO_param_length` ≤ 255. When being a parameter for
     :attr:`pylibschc.libschc.MO.MSB` it must be lesser or equal to
@@ -109,7 +223,7 @@ class CompressionRuleField(BaseModel):
         conint(ge=0x0000000000000000, le=0xFFFFFFFFFFFFFFFF),
         ipaddress.IPv6Interface,
         conbytes(max_length=MAX_FIELD_LENGTH),
-    ] = b""
+    ] = Field(b"", validate_default=True)
     """Target value for the matching operator (default: b""). Any integers in
     :attr:`CompressionRuleField.target_value` are restricted to 64 bits of width. The
     length of this must fit :attr:`CompressionRuleField.field_length` and, depending on
@@ -117,10 +231,11 @@ class CompressionRuleField(BaseModel):
     be converted to :class:`bytes` after validation.
     """
 
-    @validator("MO_param_length", allow_reuse=True, always=True, pre=False)
+    @field_validator("MO_param_length")
     @classmethod
-    def check_mo_param_length(cls, value, values):
+    def check_mo_param_length(cls, value, info):
         # pylint: disable=missing-function-docstring
+        values = info.data
         if values.get("MO") == MO.MSB or values.get("action") == CDA.LSB:
             if value > values.get("field_length", 0):
                 raise ValueError(
@@ -130,245 +245,194 @@ class CompressionRuleField(BaseModel):
                 )
         return value
 
-    @staticmethod
-    def _check_bits_overflow(bytes_value, values, field_length_mod):
-        if (
-            (len(bytes_value) > 0)
-            and (field_length_mod > 0)
-            and ((0xFF << field_length_mod) & int(bytes_value[0]))
-        ):
-            raise ValueError(
-                f"target_value={bytes_value} does not fit into "
-                f"field_length={values.get('field_length')} bits"
-            )
-
-    @classmethod
-    def _check_overflow(  # pylint: disable=too-many-arguments
-        cls, orig_value, value, values, field_length_bytes, field_length_mod
-    ):
-        if any(b for b in value[:-field_length_bytes]):
-            raise ValueError(
-                f"target_value={orig_value} does not fit into "
-                f"field_length={values.get('field_length')} bits"
-            )
-        value = value[-field_length_bytes:]
-        cls._check_bits_overflow(value, values, field_length_mod)
-        return value
-
-    @classmethod
-    def _int_target_value_to_bytes(
-        cls, int_value, values, field_length_bytes, field_length_mod
-    ):
-        value = struct.pack("!Q", int_value)
-        return cls._check_overflow(
-            int_value, value, values, field_length_bytes, field_length_mod
-        )
-
-    @classmethod
-    def _addr_target_value_to_bytes(
-        cls, addr_value, values, field_length_bytes, field_length_mod
-    ):
-        address_fields = [
-            HeaderFieldID.IP6_DEVPRE,
-            HeaderFieldID.IP6_DEVIID,
-            HeaderFieldID.IP6_APPPRE,
-            HeaderFieldID.IP6_APPIID,
-        ]
-        if values.get("field") not in address_fields:
-            raise ValueError(
-                "target_value={addr_value.compressed} but field {values.get('field')} "
-                "not in {address_fields}"
-            )
-        if values.get("field") in [HeaderFieldID.IP6_DEVPRE, HeaderFieldID.IP6_APPPRE]:
-            try:
-                # only used to checked, that's why exception raises immediately
-                ipaddress.IPv6Network(
-                    f"{addr_value.with_prefixlen.split('/')[0]}/"
-                    f"{values.get('field_length')}"
-                )
-            except ValueError:  # pylint: disable=try-except-raise
-                raise
-            return addr_value.ip.packed[:field_length_bytes]
-        # else IID, treat like 64-bit integer
-        return cls._check_overflow(
-            addr_value.compressed,
-            addr_value.ip.packed,
-            values,
-            field_length_bytes,
-            field_length_mod,
-        )
-
-    @classmethod
-    def _pad_bytes_to_field_length(
-        cls, bytes_value, values, field_length_bytes, field_length_mod
-    ):
-        cls._check_bits_overflow(bytes_value, values, field_length_mod)
-        if field_length_bytes > len(bytes_value):
-            padding = b"\x00" * (field_length_bytes - len(bytes_value))
-            return padding + bytes_value
-        return bytes_value
-
     @staticmethod
     def _field_length_bytes(field_length_bits):
-        field_length_bytes = field_length_bits // 8
-        field_length_mod = field_length_bits % 8
-        if field_length_mod:
-            field_length_bytes += 1
-        return field_length_bytes, field_length_mod
+        return (field_length_bits + 7) >> 3, field_length_bits & 7
 
-    @validator("target_value", allow_reuse=True, always=True, pre=False)
+    @field_validator("target_value", mode="wrap")
     @classmethod
-    def check_field_length_for_target_value(cls, value, values):
+    def fast_validate_target_value(cls, value, handler):
         # pylint: disable=missing-function-docstring
-        bytes_value = None
-        field_length_bytes, field_length_mod = cls._field_length_bytes(
-            values.get("field_length")
-        )
+        # skip the trial validation against all members of the union of target_value
+        # for the common cases that already have the type of one of them, i.e., the
+        # target_value of field descriptors from Python or already validated ones.
+        # pylint: disable=unidiomatic-typecheck
+        value_type = type(value)
+        if value_type is int:
+            if 0x0000000000000000 <= value <= 0xFFFFFFFFFFFFFFFF:
+                return value
+        elif value_type is bytes:
+            if len(value) <= MAX_FIELD_LENGTH:
+                return value
+        return handler(value)
+
+    @field_validator("target_value")
+    @classmethod
+    def check_field_length_for_target_value(cls, value, info):  # noqa: C901
+        # pylint: disable=missing-function-docstring,unidiomatic-typecheck
+        values = info.data
+        if "field" not in values or "field_length" not in values:
+            # field or field_length failed validation, their error is reported anyway
+            return value
+        field = values["field"]
+        field_length = values["field_length"]
+        field_length_bytes, field_length_mod = cls._field_length_bytes(field_length)
+        high_mask = _HIGH_MASK[field_length_mod]
         if values.get("MO") == MO.MATCHMAP or values.get("action") == CDA.MAPPINGSENT:
             mapping_vals = values.get("MO_param_length", 0)
         else:
             mapping_vals = 1
-        # TBD check byte order?
-        if isinstance(value, int):
-            bytes_value = cls._int_target_value_to_bytes(
-                value, values, field_length_bytes, field_length_mod
-            )
-        elif isinstance(value, ipaddress.IPv6Interface):
-            bytes_value = cls._addr_target_value_to_bytes(
-                value, values, field_length_bytes, field_length_mod
+
+        def fit_error(orig_value):
+            return ValueError(
+                f"target_value={orig_value} does not fit into "
+                f"field_length={field_length} bits"
             )
-        elif isinstance(value, typing.List):
+
+        def to_bytes(single_value):
+            # convert a single (i.e., non-list) target value to bytes of field_length
+            # TBD check byte order?
+            # check the exact types first, pydantic keeps subclasses of bytes as is
+            value_type = type(single_value)
+            if value_type is int:
+                int_value = single_value
+                orig_value = single_value
+                # integers are at most 64 bits wide, so never pad beyond 8 bytes
+                width = min(field_length_bytes, 8)
+            elif value_type is bytes or not isinstance(
+                single_value, ipaddress.IPv6Interface
+            ):
+                if single_value and (high_mask & single_value[0]):
+                    raise fit_error(single_value)
+                if field_length_bytes > len(single_value):
+                    padding = b"\x00" * (field_length_bytes - len(single_value))
+                    return padding + single_value
+                return single_value
+            else:
+                orig_value = single_value.compressed
+                if field not in _ADDR_FIELDS:
+                    raise ValueError(
+                        f"target_value={orig_value} but field {field} not in "
+                        f"{sorted(f.name for f in _ADDR_FIELDS)}"
+                    )
+                int_value = int(single_value.ip)
+                if field in _PREFIX_FIELDS:
+                    # a prefix must not have any bits set beyond field_length
+                    if field_length > 128 or (
+                        int_value & ((1 << (128 - field_length)) - 1)
+                    ):
+                        raise fit_error(orig_value)
+                    return single_value.ip.packed[:field_length_bytes]
+                # else IID, treat like integer of at most the address' 16 bytes
+                width = min(field_length_bytes, 16)
+            try:
+                bytes_value = int_value.to_bytes(width, "big")
+            except OverflowError:
+                raise fit_error(orig_value) from None
+            # bits beyond field_length are only in the first byte if it is the
+            # first byte of the field
+            if (
+                width == field_length_bytes
+                and bytes_value
+                and (high_mask & bytes_value[0])
+            ):
+                raise fit_error(bytes_value)
+            return bytes_value
+
+        if type(value) is list:
             if len(value) != mapping_vals:
                 raise ValueError(
                     f"target_value={value} is must not be longer than "
                     f"MO_param_length={mapping_vals} elements with "
                     f"MO={values.get('MO')} or action={values.get('action')}"
                 )
-            bytes_value = b"".join(
-                cls._int_target_value_to_bytes(
-                    v, values, field_length_bytes, field_length_mod
-                )
-                if isinstance(v, int)
-                else (
-                    cls._addr_target_value_to_bytes(
-                        v, values, field_length_bytes, field_length_mod
-                    )
-                    if isinstance(v, ipaddress.IPv6Interface)
-                    else cls._pad_bytes_to_field_length(
-                        v, values, field_length_bytes, field_length_mod
-                    )
-                )
-                for v in value
-            )
-        else:  # bytes
-            bytes_value = cls._pad_bytes_to_field_length(
-                value, values, field_length_bytes, field_length_mod
-            )
+            mapping = bytearray()
+            for single_value in value:
+                mapping += to_bytes(single_value)
+            bytes_value = bytes(mapping)
+        else:
+            bytes_value = to_bytes(value)
         if (field_length_bytes * mapping_vals) < len(bytes_value):
-            raise ValueError(
-                f"target_value={value} does not fit into "
-                f"field_length={values.get('field_length')} bits"
-            )
+            raise fit_error(value)
         return bytes_value
 
     @property
     def c_MO(self) -> str:  # pylint: disable=invalid-name
         # pylint: disable=missing-function-docstring
-        if self.MO == MO.MSB:
-            return "&mo_MSB"
-        return f"&mo_{self.MO.name.lower()}"
+        return _C_MO[self.MO]
 
     def c_schc_field_declaration(self):
         # pylint: disable=missing-function-docstring
         def bytes_to_hex_list(byts: bytes):
-            return ", ".join(f"0x{int(b):02x}" for b in byts)
+            return ", ".join(map(_HEX_PREFIXED.__getitem__, byts))
 
         def chunk_bytes(byts: bytes, chunk_size: int = 8):
-            res = "{\n        "
-            for i in range(0, len(byts), chunk_size):
-                res += bytes_to_hex_list(byts[i : (i + chunk_size)])  # noqa: E203
-                if (i + chunk_size) < len(byts):
-                    res += ",\n        "
-            res += "\n    },"
-            return res + "                                                      "
-
-        res = "{ " f"{self.field.name},"
-        res += (16 - len(self.field.name)) * " "
-        res += (
-            f"{self.MO_param_length:3d},"
-            f"{self.field_length:4d},"
-            f"{self.field_pos:4d}, "
-        )
-        res += f"{self.dir.name},"
-        res += (5 - len(self.dir.name)) * " "
+            chunks = ",\n        ".join(
+                bytes_to_hex_list(byts[i : (i + chunk_size)])  # noqa: E203
+                for i in range(0, len(byts), chunk_size)
+            )
+            return f"{{\n        {chunks}\n    }},{54 * ' '}"
+
+        parts = [
+            "{ ",
+            _C_FIELD[self.field],
+            f"{self.MO_param_length:3d},{self.field_length:4d},{self.field_pos:4d}, ",
+            _C_DIR[self.dir],
+        ]
         if self.MO == MO.MATCHMAP and len(self.target_value) > 3:
             field_length_bytes, _ = self._field_length_bytes(self.field_length)
-            res += chunk_bytes(self.target_value, field_length_bytes)
+            parts.append(chunk_bytes(self.target_value, field_length_bytes))
         elif len(self.target_value) > 3:
-            res += chunk_bytes(self.target_value)
+            parts.append(chunk_bytes(self.target_value))
         else:
-            hex_str = "{" f"{bytes_to_hex_list(self.target_value)}" "},"
-            res += hex_str
-            res += (20 - len(hex_str)) * " "
-        res += f"{self.c_MO},"
-        res += (15 - len(self.c_MO)) * " "
-        res += f"{self.action.name}"
-        res += (12 - len(self.action.name)) * " "
-        return res + "}"
+            hex_str = f"{{{bytes_to_hex_list(self.target_value)}}},"
+            parts.append(hex_str)
+            parts.append((20 - len(hex_str)) * " ")
+        parts.extend((_C_MO_PADDED[self.MO], _C_ACTION[self.action], "}"))
+        return "".join(parts)
 
 
 class CompressionRule(BaseRule):
     """A compression rule."""
 
-    ipv6_rule: conlist(CompressionRuleField, max_items=IP6_FIELDS) = None
+    ipv6_rule: typing.Optional[
+        conlist(CompressionRuleField, max_length=IP6_FIELDS)
+    ] = None
     """The field descriptors for the IPv6 layer (default: None). Must at most be
     :const:`pylibschc.libschc.IP6_FIELDS` long and only contain field descriptors for
     which the name of :attr:`CompressionRuleField.field` starts with `IP6_`."""
-    udp_rule: conlist(CompressionRuleField, max_items=UDP_FIELDS) = None
+    udp_rule: typing.Optional[
+        conlist(CompressionRuleField, max_length=UDP_FIELDS)
+    ] = None
     """The field descriptors for the UDP layer (default: None). Must at most be
     :const:`pylibschc.libschc.UDP_FIELDS` long and only contain field descriptors for
     which the name of :attr:`CompressionRuleField.field` starts with `UDP_`."""
-    coap_rule: conlist(CompressionRuleField, max_items=COAP_FIELDS) = None
+    coap_rule: typing.Optional[
+        conlist(CompressionRuleField, max_length=COAP_FIELDS)
+    ] = None
     """The field descriptors for the CoAP layer (default: None). Must at most be
     :const:`pylibschc.libschc.COAP_FIELDS` long and only contain field descriptors for
     which the name of :attr:`CompressionRuleField.field` starts with `COAP_`."""
 
-    @staticmethod
-    def _check_field_identifiers(value, expected_start, rule_type):
+    @field_validator("ipv6_rule", "udp_rule", "coap_rule")
+    @classmethod
+    def check_field_identifiers(cls, value, info) -> conlist:
+        # pylint: disable=missing-function-docstring
         if not value:
             return None
+        rule_type = info.field_name
         for field in value:
-            if not field.field.name.startswith(expected_start):
+            if _FIELD_LAYER_RULE[field.field] != rule_type:
                 raise ValueError(f"{field} is not a valid {rule_type} field")
         return value
 
-    @validator("ipv6_rule", allow_reuse=True)
-    @classmethod
-    def check_ipv6_rule(cls, value) -> conlist:
-        # pylint: disable=missing-function-docstring
-        return cls._check_field_identifiers(value, "IP6_", "ipv6_rule")
-
-    @validator("udp_rule", allow_reuse=True)
-    @classmethod
-    def check_udp_rule(cls, value) -> conlist:
-        # pylint: disable=missing-function-docstring
-        return cls._check_field_identifiers(value, "UDP_", "udp_rule")
-
-    @validator("coap_rule", allow_reuse=True)
-    @classmethod
-    def check_coap_rule(cls, value) -> conlist:
-        # pylint: disable=missing-function-docstring
-        return cls._check_field_identifiers(value, "COAP_", "coap_rule")
-
     def _c_schc_layer_rule_declaration(self, layer_fields):
         if not layer_fields:
             return ""
         up = 0  # pylint: disable=invalid-name
         down = 0
-        field_declarations = """{
-        /* field,           ML, len, pos, dir,  val,                MO,             CDA         */
-"""  # noqa: E501
-        for i, field in enumerate(layer_fields):
+        field_declarations = []
+        for field in layer_fields:
             if field.dir == Direction.UP:
                 up += 1  # pylint: disable=invalid-name
             elif field.dir == Direction.DOWN:
@@ -376,19 +440,20 @@ class CompressionRule(BaseRule):
             else:  # field.dir == Direction.BI
                 up += 1  # pylint: disable=invalid-name
                 down += 1
-            field_declarations += "        "
-            field_declarations += field.c_schc_field_declaration().replace(
-                "\n", "\n        "
+            field_declarations.append(
+                field.c_schc_field_declaration().replace("\n", "\n        ")
             )
-            if (i + 1) < len(layer_fields):
-                field_declarations += ",\n"
-        field_declarations += "\n    }"
-        i = 1  # pylint: disable=invalid-name
-        res = "{\n"
-        res += f"    .up = {up}, .down = {down}, .length = {len(layer_fields)},\n"
-        res += f"    {field_declarations}\n"
-        res += "}"
-        return res
+        field_declarations = ",\n        ".join(field_declarations)
+        return (
+            "{\n"
+            f"    .up = {up}, .down = {down}, .length = {len(layer_fields)},\n"
+            """    {
+        /* field,           ML, len, pos, dir,  val,                MO,             CDA         */
+"""  # noqa: E501
+            f"        {field_declarations}\n"
+            "    }\n"
+            "}"
+        )
 
     def c_schc_ipv6_rule_declaration(self) -> str:
         # pylint: disable=missing-function-docstring
@@ -409,20 +474,12 @@ class CompressionRule(BaseRule):
         ipv6_rule_ptr = f"&{ipv6_rule_name}" if self.ipv6_rule else "NULL"
         udp_rule_ptr = f"&{udp_rule_name}" if self.udp_rule else "NULL"
         coap_rule_ptr = f"&{coap_rule_name}" if self.coap_rule else "NULL"
-        return (
-            "{\n"
-            f"    .rule_id = {self.rule_id}U,\n"
-            f"    .rule_id_size_bits = {self.rule_id_size_bits}U,\n"
-            "#if USE_IP6\n"
-            f"    .ipv6_rule = {ipv6_rule_ptr},\n"
-            "#endif\n"
-            "#if USE_UDP\n"
-            f"    .udp_rule = {udp_rule_ptr},\n"
-            "#endif\n"
-            "#if USE_COAP\n"
-            f"    .coap_rule = {coap_rule_ptr},\n"
-            "#endif\n"
-            "}"
+        return _C_COMPRESSION_RULE_DECLARATION(
+            rule_id=self.rule_id,
+            rule_id_size_bits=self.rule_id_size_bits,
+            ipv6_rule_ptr=ipv6_rule_ptr,
+            udp_rule_ptr=udp_rule_ptr,
+            coap_rule_ptr=coap_rule_ptr,
         )
 
 
@@ -455,21 +512,15 @@ class FragmentationRule(BaseRule):
 
     def c_schc_fragmentation_rule_declaration(self):
         # pylint: disable=missing-function-docstring
-        return (
-            "{\n"
-            f"    .rule_id = {self.rule_id}U,\n"
-            f"    .rule_id_size_bits = {self.rule_id_size_bits}U,\n"
-            f"    .mode = {self.mode.name},\n"
-            f"    .dir = {self.dir.name},\n"
-            f"    .FCN_SIZE = {self.FCN_SIZE:6d}U,    "
-            "/* FCN field size (N in RFC) */\n"
-            f"    .MAX_WND_FCN = {self.MAX_WND_FCN:3d}U,    "
-            "/* Maximum fragments per window (WINDOW_SIZE in RFC) */\n"
-            f"    .WINDOW_SIZE = {self.WINDOW_SIZE:3d}U,    "
-            "/* W field size (M in RFC) */\n"
-            f"    .DTAG_SIZE = {self.DTAG_SIZE:5d}U     "
-            "/* DTAG field size (T in RFC) */\n"
-            "}"
+        return _C_FRAGMENTATION_RULE_DECLARATION(
+            rule_id=self.rule_id,
+            rule_id_size_bits=self.rule_id_size_bits,
+            mode=self.mode.name,
+            dir=self.dir.name,
+            FCN_SIZE=self.FCN_SIZE,
+            MAX_WND_FCN=self.MAX_WND_FCN,
+            WINDOW_SIZE=self.WINDOW_SIZE,
+            DTAG_SIZE=self.DTAG_SIZE,
         )
 
 
@@ -485,7 +536,7 @@ class Device(BaseModel):
     duty_cycle: conint(ge=0x00000000, le=0xFFFFFFFF)
     """The duty cycle in milliseconds of the device. Must be 0
     < :attr:`Device.duty_cycle` ≤ :math:`(2^{32} - 1)`."""
-    uncompressed_rule: UncompressedRule = None
+    uncompressed_rule: typing.Optional[UncompressedRule] = None
     """The rule for an uncompressed packet on this device. Must not contain any
     duplicate rule IDs (i.e., same value of same bit width) with
     :attr:`Device.compression_rules` or :attr:`Device.fragmentation_rules`."""
@@ -493,15 +544,18 @@ class Device(BaseModel):
     """The compression rules on this device (default: []). Must not contain any
     duplicate rule IDs (i.e., same value of same bit width) with
     :attr:`Device.uncompressed_rule` or :attr:`Device.fragmentation_rules`."""
-    fragmentation_rules: typing.List[FragmentationRule] = []
+    fragmentation_rules: typing.List[FragmentationRule] = Field(
+        [], validate_default=True
+    )
     """The fragmentation rules on this device (default: []). Must not contain any
     duplicate rule IDs (i.e., same value of same bit width) with
     :attr:`Device.uncompressed_rule` or :attr:`Device.compression_rules`."""
 
-    @validator("fragmentation_rules", always=True, pre=False)
+    @field_validator("fragmentation_rules")
     @classmethod
-    def check_rule_id_duplicates(cls, fragmentation_rules, values):
+    def check_rule_id_duplicates(cls, fragmentation_rules, info):
         # pylint: disable=missing-function-docstring
+        values = info.data
         uncompressed_rule = values.get("uncompressed_rule")
         compression_rules = values.get("compression_rules", [])
         rule_ids = set()
@@ -547,16 +601,14 @@ class Device(BaseModel):
         else:
             uncomp_rule_id = 0
             uncomp_rule_id_size_bits = 0
-        return (
-            "{\n"
-            f"    .device_id = {self.device_id}U,\n"
-            f"    .uncomp_rule_id = {uncomp_rule_id}U,\n"
-            f"    .uncomp_rule_id_size_bits = {uncomp_rule_id_size_bits}U,\n"
-            f"    .compression_rule_count = {compression_rules_count},\n"
-            f"    .compression_context = {compression_rules_ptr},\n"
-            f"    .fragmentation_rule_count = {fragmentation_rules_count},\n"
-            f"    .fragmentation_context = {fragmentation_rules_ptr},\n"
-            "}"
+        return _C_DEVICE_DECLARATION(
+            device_id=self.device_id,
+            uncomp_rule_id=uncomp_rule_id,
+            uncomp_rule_id_size_bits=uncomp_rule_id_size_bits,
+            compression_rules_count=compression_rules_count,
+            compression_rules_ptr=compression_rules_ptr,
+            fragmentation_rules_count=fragmentation_rules_count,
+            fragmentation_rules_ptr=fragmentation_rules_ptr,
         )
 
 
@@ -568,7 +620,7 @@ class Config(BaseModel):
     """The devices for libSCHC. Must not contain any devices with duplicate
     :attr:`Device`.device_id."""
 
-    @validator("devices")
+    @field_validator("devices")
     @classmethod
     def device_ids_unique(cls, devices):
         # pylint: disable=missing-function-docstring
@@ -580,14 +632,19 @@ class Config(BaseModel):
         return devices
 
     @staticmethod
-    def _layer_rule_to_c(visited_layer_rules, layer_name, rule, decl_func):
+    def _layer_rule_to_c(
+        visited_layer_rules, layer_rule_names, layer_name, rule, decl_func
+    ):
+        # pylint: disable=too-many-arguments
         if not rule:
             return None
-        for rule_name, (visited_rule, _) in visited_layer_rules.items():
-            if rule == visited_rule:
-                return rule_name
+        key = _content_key(rule)
+        rule_name = layer_rule_names.get(key)
+        if rule_name is not None:
+            return rule_name
         rule_name = f"{layer_name}_rule_{len(visited_layer_rules):02d}"
         visited_layer_rules[rule_name] = (rule, decl_func())
+        layer_rule_names[key] = rule_name
         return rule_name
 
     def deploy(self) -> argparse.Namespace:
@@ -630,68 +687,74 @@ class Config(BaseModel):
         visited_compression_rules = {}
         visited_fragmentation_array = {}
         visited_fragmentation_rules = {}
+        # map the content of the visited rules and arrays to their name
+        compression_layer_rule_names = {
+            "ipv6": {},
+            "udp": {},
+            "coap": {},
+        }
+        compression_array_names = {}
+        compression_rule_names = {}
+        fragmentation_array_names = {}
+        fragmentation_rule_names = {}
+        # next free suffix of the rule names per rule ID and rule ID size
+        compression_rule_suffixes = {}
+        fragmentation_rule_suffixes = {}
+        # rule objects are often shared between devices, so only build the content
+        # key once per object. self holds all rules, so their id()s stay unique.
+        rule_keys = {}
         device_decls = {}
 
+        def rule_content_key(rule):
+            key = rule_keys.get(id(rule))
+            if key is None:
+                key = rule_keys[id(rule)] = _content_key(rule)
+            return key
+
         for device in self.devices:
-            compr_array_name = ""
-            array_visited = False
-            for compr_array_name, (
-                visited_array,
-                _,
-            ) in visited_compression_array.items():
-                if device.compression_rules == visited_array:  # pragma: no cover
-                    array_visited = True
-                    break
-            if device.compression_rules and not array_visited:
+            compr_array_key = tuple(map(rule_content_key, device.compression_rules))
+            compr_array_name = compression_array_names.get(compr_array_key, "")
+            if device.compression_rules and not compr_array_name:
                 compr_array_name = (
                     f"compression_rules_{len(visited_compression_array):02d}"
                 )
-                array_decl = (
+                array_decl = [
                     "static const struct schc_compression_rule_t "
                     f"*{compr_array_name}[] = {{\n"
-                )
-                for rule in device.compression_rules:
-                    rule_visited = False
-                    for rule_name, (
-                        visited_rule,
-                        _,
-                    ) in visited_compression_rules.items():
-                        if rule == visited_rule:
-                            rule_visited = True
-                            array_decl += f"    &{rule_name},\n"
-                            break
-                    if rule_visited:
+                ]
+                for rule, rule_key in zip(device.compression_rules, compr_array_key):
+                    rule_name = compression_rule_names.get(rule_key)
+                    if rule_name is not None:
+                        array_decl.append(f"    &{rule_name},\n")
                         continue
                     ipv6_rule_name = self._layer_rule_to_c(
                         visited_compression_layer_rules["ipv6"],
+                        compression_layer_rule_names["ipv6"],
                         "ipv6",
                         rule.ipv6_rule,
                         rule.c_schc_ipv6_rule_declaration,
                     )
                     udp_rule_name = self._layer_rule_to_c(
                         visited_compression_layer_rules["udp"],
+                        compression_layer_rule_names["udp"],
                         "udp",
                         rule.udp_rule,
                         rule.c_schc_udp_rule_declaration,
                     )
                     coap_rule_name = self._layer_rule_to_c(
                         visited_compression_layer_rules["coap"],
+                        compression_layer_rule_names["coap"],
                         "coap",
                         rule.coap_rule,
                         rule.c_schc_coap_rule_declaration,
                     )
-                    rule_name = ""
-                    for i in range(  # pragma: no cover
-                        len(visited_compression_rules) + 1
-                    ):
-                        rule_name = (
-                            f"comp_rule_{rule.rule_id:03d}_"
-                            f"{rule.rule_id_size_bits:02d}_{i:02d}"
-                        )
-                        if (  # pragma: no cover
-                            rule_name not in visited_compression_rules
-                        ):
-                            break
+                    rule_id = (rule.rule_id, rule.rule_id_size_bits)
+                    i = compression_rule_suffixes.get(rule_id, 0)
+                    compression_rule_suffixes[rule_id] = i + 1
+                    rule_name = (
+                        f"comp_rule_{rule.rule_id:03d}_"
+                        f"{rule.rule_id_size_bits:02d}_{i:02d}"
+                    )
                     visited_compression_rules[rule_name] = (
                         rule,
                         rule.c_schc_compression_rule_declaration(
@@ -700,152 +763,98 @@ class Config(BaseModel):
                             coap_rule_name,
                         ),
                     )
-                    array_decl += f"    &{rule_name},\n"
-                array_decl += "}"
+                    compression_rule_names[rule_key] = rule_name
+                    array_decl.append(f"    &{rule_name},\n")
+                array_decl.append("}")
                 visited_compression_array[compr_array_name] = (
                     device.compression_rules,
-                    array_decl,
+                    "".join(array_decl),
                 )
-            frag_array_name = ""
-            array_visited = False
-            for frag_array_name, (
-                visited_array,
-                _,
-            ) in visited_fragmentation_array.items():
-                if device.fragmentation_rules == visited_array:  # pragma: no cover
-                    array_visited = True
-                    break
-            if device.fragmentation_rules and not array_visited:
+                compression_array_names[compr_array_key] = compr_array_name
+            frag_array_key = tuple(map(rule_content_key, device.fragmentation_rules))
+            frag_array_name = fragmentation_array_names.get(frag_array_key, "")
+            if device.fragmentation_rules and not frag_array_name:
                 frag_array_name = (
                     f"fragmentation_rules_{len(visited_fragmentation_array):02d}"
                 )
-                array_decl = (
+                array_decl = [
                     "static const struct schc_fragmentation_rule_t "
                     f"*{frag_array_name}[] = {{\n"
-                )
-                for rule in device.fragmentation_rules:
-                    rule_visited = False
-                    for rule_name, (
-                        visited_rule,
-                        _,
-                    ) in visited_fragmentation_rules.items():
-                        if rule == visited_rule:
-                            rule_visited = True
-                            array_decl += f"    &{rule_name},\n"
-                            break
-                    if rule_visited:
+                ]
+                for rule, rule_key in zip(device.fragmentation_rules, frag_array_key):
+                    rule_name = fragmentation_rule_names.get(rule_key)
+                    if rule_name is not None:
+                        array_decl.append(f"    &{rule_name},\n")
                         continue
-                    rule_name = ""
-                    for i in range(  # pragma: no cover
-                        len(visited_fragmentation_rules) + 1
-                    ):
-                        rule_name = (
-                            f"frag_rule_{rule.rule_id:03d}_"
-                            f"{rule.rule_id_size_bits:02d}_{i:02d}"
-                        )
-                        if (  # pragma: no cover
-                            rule_name not in visited_fragmentation_rules
-                        ):
-                            break
+                    rule_id = (rule.rule_id, rule.rule_id_size_bits)
+                    i = fragmentation_rule_suffixes.get(rule_id, 0)
+                    fragmentation_rule_suffixes[rule_id] = i + 1
+                    rule_name = (
+                        f"frag_rule_{rule.rule_id:03d}_"
+                        f"{rule.rule_id_size_bits:02d}_{i:02d}"
+                    )
                     visited_fragmentation_rules[rule_name] = (
                         rule,
                         rule.c_schc_fragmentation_rule_declaration(),
                     )
-                    array_decl += f"    &{rule_name},\n"
-                array_decl += "}"
+                    fragmentation_rule_names[rule_key] = rule_name
+                    array_decl.append(f"    &{rule_name},\n")
+                array_decl.append("}")
                 visited_fragmentation_array[frag_array_name] = (
                     device.fragmentation_rules,
-                    array_decl,
+                    "".join(array_decl),
                 )
+                fragmentation_array_names[frag_array_key] = frag_array_name
             device_decls[
                 f"device{device.device_id}"
             ] = device.c_schc_device_declaration(
                 compr_array_name,
                 frag_array_name,
             )
-        res = """/*
- * generated by pylibschc with schc_config.h
- *
- * ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
- * #define USE_IP6              1
- * #define USE_UDP              1
- * #define USE_COAP             1
-"""
-        res += (
-            " * #define MAX_FIELD_LENGTH     "
-            f"{MAX_FIELD_LENGTH}\n"
-            " * #define IP6_FIELDS           "
-            f"{IP6_FIELDS}\n"
-            " * #define UDP_FIELDS           "
-            f"{UDP_FIELDS}\n"
-            " * #define COAP_FIELDS          "
-            f"{COAP_FIELDS}\n"
-            " * #define FCN_SIZE_BITS        "
-            f"{FCN_SIZE_BITS}\n"
-            " * #define DTAG_SIZE_BITS       "
-            f"{DTAG_SIZE_BITS}\n"
-            " * #define BITMAP_SIZE_BITS     "
-            f"{BITMAP_SIZE_BITS}\n"
-        )
-        res += """ * ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
- */
-
-#ifndef RULES_RULE_CONFIG_H
-#define RULES_RULE_CONFIG_H
-
-#include "schc.h"
-
-#ifdef __cplusplus
-extern "C" {
-#endif
-"""
+        res = io.StringIO()
+        res.write(_C_HEADER_PREAMBLE)
         for layer_define, layer_name in [
             ("USE_IP6", "ipv6"),
             ("USE_UDP", "udp"),
             ("USE_COAP", "coap"),
         ]:
             if visited_compression_layer_rules[layer_name]:  # pragma: no cover
-                res += f"\n#if {layer_define}"
+                res.write(f"\n#if {layer_define}")
                 for rule_name, rule_decl in sorted(
                     visited_compression_layer_rules[layer_name].items()
                 ):
-                    res += (
+                    res.write(
                         f"\nstatic const struct schc_{layer_name}_rule_t "
                         f"{rule_name} = {rule_decl[1]};\n"
                     )
-                res += f"#endif /* {layer_define} */\n"
+                res.write(f"#endif /* {layer_define} */\n")
         for rule_name, rule_decl in sorted(visited_compression_rules.items()):
-            res += (
+            res.write(
                 f"\nstatic const struct schc_compression_rule_t "
                 f"{rule_name} = {rule_decl[1]};\n"
             )
         for rule_name, rule_decl in sorted(visited_fragmentation_rules.items()):
-            res += (
+            res.write(
                 f"\nstatic const struct schc_fragmentation_rule_t "
                 f"{rule_name} = {rule_decl[1]};\n"
             )
         for _, array_decl in sorted(visited_compression_array.items()):
-            res += f"\n{array_decl[1]};\n"
+            res.write(f"\n{array_decl[1]};\n")
 
         for _, array_decl in sorted(visited_fragmentation_array.items()):
-            res += f"\n{array_decl[1]};\n"
+            res.write(f"\n{array_decl[1]};\n")
 
         for device_name, device_decl in device_decls.items():
-            res += f"\nstatic const struct schc_device {device_name} = {device_decl};\n"
+            res.write(
+                f"\nstatic const struct schc_device {device_name} = {device_decl};\n"
+            )
         if device_decls:
-            res += "\nstatic const struct schc_device* devices[] = {\n"
-            res += ",\n".join(f"    &{device_name}" for device_name in device_decls)
-            res += "\n};\n"
+            res.write("\nstatic const struct schc_device* devices[] = {\n    &")
+            res.write(",\n    &".join(device_decls))
+            res.write("\n};\n")
             device_count = "(sizeof(devices) / sizeof(devices[0]))"
         else:
             device_count = "0"  # pragma: no cover
-        res += f"\n#define DEVICE_COUNT    ((int){device_count})"
-        res += """
-
-#ifdef __cplusplus
-}
-#endif
-
-#endif /* RULES_RULE_CONFIG_H */
-"""
-        return res
+        res.write(f"\n#define DEVICE_COUNT    ((int){device_count})")
+        res.write(_C_HEADER_TRAILER)
+        return res.getvalue()
@@ -5,6 +5,7 @@
 # SPDX-License-Identifier: GPL-3.0-only
 
 import os
+import re
 
 from distutils.command.build import build
 from setuptools import setup, find_packages, Extension
@@ -16,8 +17,7 @@ LICENSE = "GPLv3"
 
 def get_requirements():
     with open("requirements.txt", encoding="utf-8") as req_file:
-        for line in req_file:
-            yield line.strip()
+        return [line.strip() for line in req_file.read().splitlines() if line.strip()]
 
 
 def get_version(package):
@@ -29,9 +29,11 @@ def get_version(package):
     Inspired from pep8 setup.py
     """
     with open(os.path.join(package, "__init__.py"), encoding="utf-8") as init_fd:
-        for line in init_fd:
-            if line.startswith("__version__"):
-                return eval(line.split("=")[-1])  # pylint:disable=eval-used
+        match = re.search(
+            r"^__version__\s*=\s*([\"'])([^\"']+)\1", init_fd.read(), re.MULTILINE
+        )
+    if match:
+        return match.group(2)
     return None
 
 
@@ -78,7 +80,7 @@ setup(
         "Intended Audience :: Science/Research",
     ],
     setup_requires=["setuptools>=42", "Cython<3", "wheel"],
-    install_requires=list(get_requirements()),
+    install_requires=get_requirements(),
     cmdclass={"build": Build},
     ext_modules=[
         Extension(
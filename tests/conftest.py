@@ -21,15 +21,34 @@ __license__ = "GPLv3"
 __email__ = "m.lenders@fu-berlin.de"
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--run-slow",
+        action="store_true",
+        default=False,
+        help="also run tests marked as slow, e.g., those building libSCHC with make",
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: test is skipped without --run-slow")
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="needs --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
 @pytest.fixture(autouse=True)
 def reset_devices():
     yield
-    device_ids = []
-    # get all device ids to not change Device internals during iteration
+    # Device.iter() iterates over a snapshot, so devices can be deleted on the way
     for device in pylibschc.device.Device.iter():
-        device_ids.append(device.device_id)
-    for device_id in device_ids:
-        pylibschc.device.Device.delete(device_id)
+        pylibschc.device.Device.delete(device.device_id)
 
 
 # pylint: disable=R0801
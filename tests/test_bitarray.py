@@ -27,13 +27,27 @@ def test_bit_array():
     assert bit_array.bit_length == len(test) * 8
 
 
+def bit_slices(bit_length):
+    # all (pos, length) pairs of a non-empty slice within bit_length bits
+    return [
+        (pos, length)
+        for pos in range(bit_length)
+        for length in range(1, bit_length - pos + 1)
+    ]
+
+
 def test_bit_array_get_bits():
     test = b"\x92\xd1"
     bit_array = pylibschc.libschc.BitArray(len(test))  # pylint: disable=no-member
     bit_array.buffer = test
-    assert bit_array.get_bits(0, 8) == 0x92
-    assert bit_array.get_bits(0, 3) == 0x4
-    assert bit_array.get_bits(0, 14) == 0x24B4
+    # compare all valid slices against a reference, collected in one assertion
+    test_int = int.from_bytes(test, "big")
+    bit_length = len(test) * 8
+    slices = bit_slices(bit_length)
+    assert [bit_array.get_bits(pos, length) for pos, length in slices] == [
+        (test_int >> (bit_length - pos - length)) & ((1 << length) - 1)
+        for pos, length in slices
+    ]
     with pytest.raises(ValueError):
         bit_array.get_bits(0, 33)
     with pytest.raises(ValueError):
@@ -47,11 +61,25 @@ def test_bit_array_get_bits():
 def test_bit_array_copy_bits():
     test = b"\x92\xd1"
     bit_array = pylibschc.libschc.BitArray(len(test))  # pylint: disable=no-member
-    bit_array.buffer = test
-    bit_array.copy_bits(1, b"\xff", 2)
-    assert bit_array.buffer == b"\xf2\xd1"
-    bit_array.copy_bits(1, b"\x31", 8)
-    assert bit_array.buffer == b"\x98\xd1"
+    # copy the leading bits of data to all valid slices and compare against a
+    # reference, collected in one assertion
+    data = b"\x31\xa5"
+    test_int = int.from_bytes(test, "big")
+    data_int = int.from_bytes(data, "big")
+    bit_length = len(test) * 8
+    slices = bit_slices(bit_length)
+    results = []
+    for pos, length in slices:
+        bit_array.buffer = test
+        bit_array.copy_bits(pos, data, length)
+        results.append(bit_array.buffer)
+    expected = []
+    for pos, length in slices:
+        shift = bit_length - pos - length
+        mask = ((1 << length) - 1) << shift
+        value = (data_int >> (len(data) * 8 - length)) << shift
+        expected.append(((test_int & ~mask) | value).to_bytes(len(test), "big"))
+    assert results == expected
     with pytest.raises(ValueError):
         bit_array.copy_bits(2, b"\xf0", 15)
     with pytest.raises(ValueError):
@@ -86,38 +86,40 @@ def test_compressor_reassembler_io_type_error(test_rules):
 
 
 @pytest.mark.parametrize(
-    "pkt, direction, exp_rules, exp_payload",
+    "pkt_bytes, direction, exp_rules, exp_payload",
     [
         pytest.param(
-            IPv6(),
+            bytes(IPv6()),
             pylibschc.compressor.Direction.UP,
             ("uncompressed_rule",),
             bytes(IPv6()),
             id="uncompressed rule, UP",
         ),
         pytest.param(
-            IPv6(),
+            bytes(IPv6()),
             pylibschc.compressor.Direction.DOWN,
             ("uncompressed_rule",),
             bytes(IPv6()),
             id="uncompressed rule, DOWN",
         ),
         pytest.param(
-            IPv6(hlim=64, src="2001:db8:1::2", dst="2001:db8::1")
-            / UDP(
-                sport=8001,
-                dport=8000,
-            )
-            / CoAP(
-                ver=1,
-                code="GET",
-                type="NON",
-                msg_id=0x23B0,
-                token=b"\x12\x34\x56\x78",
-                options=[("Uri-Path", b"temp")],
-                paymark=b"\xff",
-            )
-            / b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam",
+            bytes(
+                IPv6(hlim=64, src="2001:db8:1::2", dst="2001:db8::1")
+                / UDP(
+                    sport=8001,
+                    dport=8000,
+                )
+                / CoAP(
+                    ver=1,
+                    code="GET",
+                    type="NON",
+                    msg_id=0x23B0,
+                    token=b"\x12\x34\x56\x78",
+                    options=[("Uri-Path", b"temp")],
+                    paymark=b"\xff",
+                )
+                / b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam"
+            ),
             pylibschc.compressor.Direction.DOWN,
             ("compression_rules", 1),
             (
@@ -130,40 +132,48 @@ def test_compressor_reassembler_io_type_error(test_rules):
             id="2nd rule, CoAP, DOWN",
         ),
         pytest.param(
-            IPv6(hlim=64, src="fe80::1", dst="fe80::2")
-            / ICMPv6EchoRequest(id=57428, seq=32838, data="Hello World!"),
+            bytes(
+                IPv6(hlim=64, src="fe80::1", dst="fe80::2")
+                / ICMPv6EchoRequest(id=57428, seq=32838, data="Hello World!")
+            ),
             pylibschc.compressor.Direction.UP,
             ("compression_rules", 2),
             b"\xb4\x00\x06\x81\x0f\x02\xa4\x022C+ccy\x02\xbb{\x93c!\x08",
             id="3rd rule, ICMPv6, UP",
         ),
         pytest.param(
-            IPv6(hlim=64, src="fe80::2", dst="fe80::1")
-            / ICMPv6EchoReply(id=57428, seq=32838, data="Hello World!"),
+            bytes(
+                IPv6(hlim=64, src="fe80::2", dst="fe80::1")
+                / ICMPv6EchoReply(id=57428, seq=32838, data="Hello World!")
+            ),
             pylibschc.compressor.Direction.DOWN,
             ("compression_rules", 2),
             b"\xb4\x08\x06y\x0f\x02\xa4\x022C+ccy\x02\xbb{\x93c!\x08",
             id="3rd rule, ICMPv6, DOWN",
         ),
         pytest.param(
-            IPv6(hlim=64, src="fe80::1", dst="fe80::2")
-            / UDP(
-                sport=5001,
-                dport=5000,
-            )
-            / CoAP(),
+            bytes(
+                IPv6(hlim=64, src="fe80::1", dst="fe80::2")
+                / UDP(
+                    sport=5001,
+                    dport=5000,
+                )
+                / CoAP()
+            ),
             pylibschc.compressor.Direction.UP,
             ("compression_rules", 2),
             b"0",
             id="3rd rule, CoAP, UP",
         ),
         pytest.param(
-            IPv6(hlim=64, src="fe80::2", dst="fe80::1")
-            / UDP(
-                sport=5000,
-                dport=5001,
-            )
-            / CoAP(),
+            bytes(
+                IPv6(hlim=64, src="fe80::2", dst="fe80::1")
+                / UDP(
+                    sport=5000,
+                    dport=5001,
+                )
+                / CoAP()
+            ),
             pylibschc.compressor.Direction.DOWN,
             ("compression_rules", 2),
             b"0",
@@ -173,7 +183,7 @@ def test_compressor_reassembler_io_type_error(test_rules):
     indirect=["exp_rules"],
 )
 def test_compressor_reassembler(
-    pkt, direction, exp_rules, exp_payload  # pylint: disable=redefined-outer-name
+    pkt_bytes, direction, exp_rules, exp_payload  # pylint: disable=redefined-outer-name
 ):
     device = exp_rules["device"]
     rule_id = exp_rules["rule_id"]
@@ -181,14 +191,14 @@ def test_compressor_reassembler(
     pylibschc.compressor.CompressorDecompressor(device=device)
     # check __new__ if
     c_r = pylibschc.compressor.CompressorDecompressor(device=device)
-    bit_array = pylibschc.compressor.BitArray(bytes(pkt))
+    bit_array = pylibschc.compressor.BitArray(pkt_bytes)
     comp_res = c_r.output(bit_array, direction)
     # bytes input has same effect as BitArray
-    assert comp_res == c_r.output(bytes(pkt), direction)
+    assert comp_res == c_r.output(pkt_bytes, direction)
     assert comp_res[0] == exp_result
     assert comp_res[1].buffer == bytes([rule_id]) + exp_payload
 
     uncomp_res = c_r.input(comp_res[1], direction)
     # bytes input has same effect as BitArray
     assert uncomp_res == c_r.input(comp_res[1].buffer, direction)
-    assert uncomp_res == bytes(pkt)  # decompression results in packet again
+    assert uncomp_res == pkt_bytes  # decompression results in packet again
@@ -17,6 +17,12 @@ __license__ = "GPLv3"
 __email__ = "m.lenders@fu-berlin.de"
 
 
+@pytest.fixture
+def device():
+    # removed again by the reset_devices fixture in conftest.py
+    return pylibschc.device.Device(1, 50, 5000)
+
+
 # pylint: disable=R0801
 def test_device_init():
     with pytest.raises(ValueError):
@@ -25,6 +31,22 @@ def test_device_init():
     assert device == pylibschc.device.Device(1, 50, 5000)
 
 
+def test_device_init_repeated():
+    device = pylibschc.device.Device(1, 50, 5000)
+    device.fragmentation_rules = [
+        pylibschc.rules.FragmentationRule(
+            rule_id=22, rule_id_size_bits=8, mode="NO_ACK", dir="UP"
+        ),
+    ]
+    fragmentation_rules = device.fragmentation_rules
+    again = pylibschc.device.Device(1, 60, 500)
+    assert again is device
+    assert again.mtu == 60
+    assert again.duty_cycle_ms == 500
+    # cached rules are kept
+    assert again.fragmentation_rules is fragmentation_rules
+
+
 def test_device_delete():
     # test what happens if device does not exist (it should be nothing)
     pylibschc.device.Device.delete(1)
@@ -47,15 +69,20 @@ def test_device_get():
 
 
 def test_device_iter():
-    devices = []
-    for i in range(1, 12):
-        devices.append(pylibschc.device.Device(i, 50, 5000))
-    for device, iter_device in zip(devices, pylibschc.device.Device.iter()):
-        assert device == iter_device
-
-
-def test_device_compression_rules():
-    device = pylibschc.device.Device(1, 50, 5000)
+    devices = [pylibschc.device.Device(i, 50, 5000) for i in range(1, 12)]
+    assert list(pylibschc.device.Device.iter()) == devices
+    # devices created out of order are still iterated by device_id
+    pylibschc.device.Device.delete(5)
+    devices[4] = pylibschc.device.Device(5, 50, 5000)
+    assert list(pylibschc.device.Device.iter()) == devices
+    # also after the device with the largest device_id was replaced
+    pylibschc.device.Device.delete(11)
+    devices[10:] = [pylibschc.device.Device(i, 50, 5000) for i in (13, 11, 12)]
+    devices.sort(key=lambda device: device.device_id)
+    assert list(pylibschc.device.Device.iter()) == devices
+
+
+def test_device_compression_rules(device):  # pylint: disable=redefined-outer-name
     compression_rules = [
         pylibschc.rules.CompressionRule(
             rule_id=1,
@@ -98,10 +125,25 @@ def test_device_compression_rules():
     assert not device.compression_rules
     device.compression_rules = compression_rules
     assert device.compression_rules == compression_rules
+    assert device.compression_rule_ids == [(1, 8)]
     # check caching
     assert device.compression_rules == compression_rules
+    # check round-trip through libSCHC
+    device._compression_rules = None  # pylint: disable=protected-access
+    assert device.compression_rules == compression_rules
+    assert isinstance(
+        device.compression_rules[0].ipv6_rule[0], pylibschc.rules.CompressionRuleField
+    )
+    # changing the rules after assignment does not change the rules of the device
+    device.compression_rules = compression_rules
+    compression_rules[0].rule_id = 2
+    compression_rules[0].ipv6_rule[0].field_pos = 2
+    assert device.compression_rules[0].rule_id == 1
+    assert device.compression_rules[0].ipv6_rule[0].field_pos == 1
+    assert device.compression_rule_ids == [(1, 8)]
     device.compression_rules = None
     assert not device.compression_rules
+    assert not device.compression_rule_ids
 
 
 def test_device_device_id():
@@ -109,8 +151,7 @@ def test_device_device_id():
     assert device.device_id == 60182
 
 
-def test_device_fragmentation_rules():
-    device = pylibschc.device.Device(1, 50, 5000)
+def test_device_fragmentation_rules(device):  # pylint: disable=redefined-outer-name
     fragmentation_rules = [
         pylibschc.rules.FragmentationRule(
             rule_id=22,
@@ -136,14 +177,23 @@ def test_device_fragmentation_rules():
     assert not device.fragmentation_rules
     device.fragmentation_rules = fragmentation_rules
     assert device.fragmentation_rules == fragmentation_rules
+    assert device.fragmentation_rule_ids == [(22, 8), (23, 8)]
     # check caching
     assert device.fragmentation_rules == fragmentation_rules
+    # check round-trip through libSCHC
+    device._fragmentation_rules = None  # pylint: disable=protected-access
+    assert device.fragmentation_rules == fragmentation_rules
+    # changing the rules after assignment does not change the rules of the device
+    device.fragmentation_rules = fragmentation_rules
+    fragmentation_rules[0].rule_id = 24
+    assert [r.rule_id for r in device.fragmentation_rules] == [22, 23]
+    assert device.fragmentation_rule_ids == [(22, 8), (23, 8)]
     device.fragmentation_rules = None
     assert not device.fragmentation_rules
+    assert not device.fragmentation_rule_ids
 
 
-def test_device_uncompressed_rule():
-    device = pylibschc.device.Device(1, 50, 5000)
+def test_device_uncompressed_rule(device):  # pylint: disable=redefined-outer-name
     uncompressed_rule = pylibschc.rules.UncompressedRule(
         rule_id=21, rule_id_size_bits=8
     )
@@ -152,5 +202,8 @@ def test_device_uncompressed_rule():
     assert device.uncompressed_rule == uncompressed_rule
     # check caching
     assert device.uncompressed_rule == uncompressed_rule
+    # changing the rule after assignment does not change the rule of the device
+    uncompressed_rule.rule_id = 20
+    assert device.uncompressed_rule.rule_id == 21
     device.uncompressed_rule = None
     assert not device.uncompressed_rule
@@ -7,8 +7,11 @@
 # pylint: disable=missing-function-docstring
 
 import asyncio
+import heapq
+import itertools
 import queue
 import threading
+import time
 import typing
 
 import pytest
@@ -32,180 +35,154 @@ __email__ = "m.lenders@fu-berlin.de"
 MTU = 60
 DUTY_CYCLE_MS = 150
 REPEATS = 2
+# transmission is considered finished when no frame is sent for SEND_TIMEOUT seconds
+SEND_TIMEOUT = 5 * (DUTY_CYCLE_MS / 1000)
+REASSEMBLY_TIMEOUT = 10 * (DUTY_CYCLE_MS / 1000)
 
-TEST_PARAMS = [
+LOREM = b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam"
+LOREM_LONG = (
+    LOREM + b" nonumy eirmod tempor invidunt ut labore et dolore magna aliquyam"
+)
+COAP_PKT = bytes(
+    IPv6(hlim=64, src="2001:db8:1::2", dst="2001:db8::1")
+    / UDP(
+        sport=8001,
+        dport=8000,
+    )
+    / CoAP(
+        ver=1,
+        code="GET",
+        type="NON",
+        msg_id=0x23B0,
+        token=b"\x12\x34\x56\x78",
+        options=[("Uri-Path", b"temp")],
+        paymark=b"\xff",
+    )
+    / LOREM
+)
+
+MODES = [
+    pylibschc.fragmenter.FragmentationMode.NO_ACK,
+    pylibschc.fragmenter.FragmentationMode.ACK_ALWAYS,
+    pylibschc.fragmenter.FragmentationMode.ACK_ON_ERROR,
+]
+PAYLOADS = [
     (
-        pylibschc.fragmenter.FragmentationMode.NO_ACK,
+        "foobar",
         bytes,
         b"foobar",
         False,
         pylibschc.fragmenter.FragmentationResult.NO_FRAGMENTATION,
     ),
+    ("lorem", bytes, LOREM, False, pylibschc.fragmenter.FragmentationResult.SUCCESS),
     (
-        pylibschc.fragmenter.FragmentationMode.NO_ACK,
-        bytes,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam",
-        False,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.NO_ACK,
+        "lorem",
         pylibschc.fragmenter.BitArray,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam",
+        LOREM,
         False,
         pylibschc.fragmenter.FragmentationResult.SUCCESS,
     ),
     (
-        pylibschc.fragmenter.FragmentationMode.NO_ACK,
-        bytes,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam nonumy "
-        b"eirmod tempor invidunt ut labore et dolore magna aliquyam",
-        False,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.NO_ACK,
-        bytes,
-        bytes(
-            IPv6(hlim=64, src="2001:db8:1::2", dst="2001:db8::1")
-            / UDP(
-                sport=8001,
-                dport=8000,
-            )
-            / CoAP(
-                ver=1,
-                code="GET",
-                type="NON",
-                msg_id=0x23B0,
-                token=b"\x12\x34\x56\x78",
-                options=[("Uri-Path", b"temp")],
-                paymark=b"\xff",
-            )
-            / b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam"
-        ),
-        True,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ALWAYS,
-        bytes,
-        b"foobar",
-        False,
-        pylibschc.fragmenter.FragmentationResult.NO_FRAGMENTATION,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ALWAYS,
+        "lorem_long",
         bytes,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam",
+        LOREM_LONG,
         False,
         pylibschc.fragmenter.FragmentationResult.SUCCESS,
     ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ALWAYS,
-        pylibschc.fragmenter.BitArray,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam",
-        False,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ALWAYS,
-        bytes,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam nonumy "
-        b"eirmod tempor invidunt ut labore et dolore magna aliquyam",
-        False,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ALWAYS,
-        bytes,
-        bytes(
-            IPv6(hlim=64, src="2001:db8:1::2", dst="2001:db8::1")
-            / UDP(
-                sport=8001,
-                dport=8000,
-            )
-            / CoAP(
-                ver=1,
-                code="GET",
-                type="NON",
-                msg_id=0x23B0,
-                token=b"\x12\x34\x56\x78",
-                options=[("Uri-Path", b"temp")],
-                paymark=b"\xff",
-            )
-            / b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam"
-        ),
-        True,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ON_ERROR,
-        bytes,
-        b"foobar",
-        False,
-        pylibschc.fragmenter.FragmentationResult.NO_FRAGMENTATION,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ON_ERROR,
-        bytes,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam",
-        False,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ON_ERROR,
-        bytes,
-        b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam nonumy "
-        b"eirmod tempor invidunt ut labore et dolore magna aliquyam",
-        False,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
-    (
-        pylibschc.fragmenter.FragmentationMode.ACK_ON_ERROR,
-        bytes,
-        bytes(
-            IPv6(hlim=64, src="2001:db8:1::2", dst="2001:db8::1")
-            / UDP(
-                sport=8001,
-                dport=8000,
-            )
-            / CoAP(
-                ver=1,
-                code="GET",
-                type="NON",
-                msg_id=0x23B0,
-                token=b"\x12\x34\x56\x78",
-                options=[("Uri-Path", b"temp")],
-                paymark=b"\xff",
-            )
-            / b"Lorem ipsum dolor sit amet, consetetur sadipscing elitr, sed diam"
-        ),
-        True,
-        pylibschc.fragmenter.FragmentationResult.SUCCESS,
-    ),
+    ("coap", bytes, COAP_PKT, True, pylibschc.fragmenter.FragmentationResult.SUCCESS),
 ]
+# short test IDs, so the payloads do not end up in the test names
+TEST_PARAMS = [
+    pytest.param(mode, *payload, id=f"{mode.name}-{payload[0].__name__}-{name}")
+    for mode in MODES
+    for name, *payload in PAYLOADS
+]
+
+
+def fragmentation_rule_ids(device):
+    # the tests recognize fragments by their first byte
+    assert all(rule.rule_id_size_bits == 8 for rule in device.fragmentation_rules)
+    return frozenset(rule.rule_id for rule in device.fragmentation_rules)
+
+
+class _TimerScheduler:
+    """Runs the timer tasks of all connections from a single daemon thread."""
+
+    def __init__(self):
+        self._heap = []
+        self._entries = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="TimerScheduler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def schedule(self, key, delay_sec, func, arg):
+        with self._cond:
+            self._cancel(key)
+            # [deadline, tie breaker, key, func, arg]
+            entry = [time.monotonic() + delay_sec, next(self._seq), key, func, arg]
+            self._entries[key] = entry
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+
+    def cancel(self, key):
+        with self._cond:
+            self._cancel(key)
+
+    def _cancel(self, key):
+        # expects self._cond to be held, canceled entries are dropped when popped
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[3] = None
+
+    def shutdown(self):
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._entries.clear()
+            self._cond.notify()
+        self._thread.join()
+
+    def _next_due(self):
+        # expects self._cond to be held
+        while self._running:
+            if not self._heap:
+                self._cond.wait()
+                continue
+            timeout = self._heap[0][0] - time.monotonic()
+            if timeout > 0:
+                self._cond.wait(timeout)
+                continue
+            entry = heapq.heappop(self._heap)
+            if entry[3] is None:
+                continue
+            del self._entries[entry[2]]
+            return entry
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                entry = self._next_due()
+            if entry is None:
+                return
+            entry[3](entry[4])
 
 
 class TestFragmenterReassemblerThreaded:  # pylint: disable=too-many-instance-attributes
     # pylint: disable=attribute-defined-outside-init
     def setup_method(self, method):  # pylint: disable=unused-argument
-        self.timers = {}
+        self.timers = _TimerScheduler()
         self.send_queue = queue.Queue()
         self.end_tx_called = False
         self.reassembler_queue = queue.Queue()
         self.timer_lock = threading.Lock()
 
     def teardown_method(self, method):  # pylint: disable=unused-argument
-        for timer in list(self.timers.values()):
-            # wait for threads to finish to free all resources
-            if timer.is_alive():  # pragma: no cover
-                timer.cancel()
-                timer.join()
-        # cleanup removed but still running Timer threads
-        for timer in [t for t in threading.enumerate() if t.name.startswith("Timer-")]:
-            if timer.is_alive():  # pragma: no cover
-                timer.cancel()
-                timer.join()
+        # wait for the timer thread to finish to free all resources
+        self.timers.shutdown()
 
     def send_frag(self, buffer: bytes) -> int:
         assert len(buffer) <= MTU
@@ -228,11 +205,7 @@ class TestFragmenterReassemblerThreaded:  # pylint: disable=too-many-instance-at
             with self.timer_lock:
                 return timer_task(the_arg)
 
-        if conn in self.timers:
-            self.timers[conn].cancel()
-        self.timers[conn] = threading.Timer(delay_sec, _timer_task, args=(arg,))
-        self.timers[conn].name = f"Timer-{conn}"
-        self.timers[conn].start()
+        self.timers.schedule(conn, delay_sec, _timer_task, arg)
 
     def end_rx(self, conn: pylibschc.fragmenter.FragmentationConnection):
         self.reassembler_queue.put_nowait(conn.mbuf)
@@ -242,50 +215,51 @@ class TestFragmenterReassemblerThreaded:  # pylint: disable=too-many-instance-at
         self.end_tx_called = True
 
     def remove_timer_entry(self, conn: pylibschc.fragmenter.FragmentationConnection):
-        if conn in self.timers:
-            self.timers[conn].cancel()
-            del self.timers[conn]
+        self.timers.cancel(conn)
+
+    def handle_cmd(self, cmd):
+        # expects self.timer_lock to be held
+        buffer = cmd["data"]
+        assert cmd["cmd"] in ["frag", "ack"]
+        if buffer[0] in self.frag_rule_ids:
+            if cmd["cmd"] == "ack":
+                was_awaiting_ack = self.fragmenter.is_awaiting_ack()
+                # is an ACK, handle at fragmenter
+                res = self.fragmenter.input(self.input_type(buffer))
+                if was_awaiting_ack:  # pragma: no cover
+                    assert res == pylibschc.fragmenter.ReassemblyStatus.ACK_HANDLED
+            else:
+                # otherwise handle at reassembler
+                res = self.reassembler.input(self.input_type(buffer))
+                assert res in (
+                    pylibschc.fragmenter.ReassemblyStatus.STAY_ALIVE,
+                    pylibschc.fragmenter.ReassemblyStatus.COMPLETED,
+                    pylibschc.fragmenter.ReassemblyStatus.ONGOING,
+                )
+        else:
+            assert cmd["cmd"] == "frag"
+            # otherwise handle at reassembler
+            assert (
+                self.reassembler.input(self.input_type(buffer))
+                == pylibschc.fragmenter.ReassemblyStatus.COMPLETED
+            )
 
     def reassemble(self):
-        try:
-            while True:
-                cmd = self.send_queue.get(timeout=5 * (DUTY_CYCLE_MS / 1000))
-                buffer = cmd["data"]
-                assert cmd["cmd"] in ["frag", "ack"]
-                is_fragmented = False
-                for rule in self.fragmenter.device.fragmentation_rules:
-                    assert rule.rule_id_size_bits == 8
-                    if rule.rule_id == buffer[0]:
-                        is_fragmented = True
-                if is_fragmented:
-                    if cmd["cmd"] == "ack":
-                        was_awaiting_ack = self.fragmenter.is_awaiting_ack()
-                        with self.timer_lock:
-                            # is an ACK, handle at fragmenter
-                            res = self.fragmenter.input(self.input_type(buffer))
-                        if was_awaiting_ack:  # pragma: no cover
-                            assert res == (
-                                pylibschc.fragmenter.ReassemblyStatus.ACK_HANDLED
-                            )
-                    else:
-                        with self.timer_lock:
-                            # otherwise handle at reassembler
-                            res = self.reassembler.input(self.input_type(buffer))
-                        assert res in (
-                            pylibschc.fragmenter.ReassemblyStatus.STAY_ALIVE,
-                            pylibschc.fragmenter.ReassemblyStatus.COMPLETED,
-                            pylibschc.fragmenter.ReassemblyStatus.ONGOING,
-                        )
-                else:
-                    assert cmd["cmd"] == "frag"
-                    with self.timer_lock:
-                        # otherwise handle at reassembler
-                        assert (
-                            self.reassembler.input(self.input_type(buffer))
-                            == pylibschc.fragmenter.ReassemblyStatus.COMPLETED
-                        )
-        except queue.Empty:
-            assert self.end_tx_called
+        while True:
+            try:
+                batch = [self.send_queue.get(timeout=SEND_TIMEOUT)]
+            except queue.Empty:
+                break
+            # drain everything that was sent in the meantime to handle it in one go
+            try:
+                while True:
+                    batch.append(self.send_queue.get_nowait())
+            except queue.Empty:
+                pass
+            with self.timer_lock:
+                for cmd in batch:
+                    self.handle_cmd(cmd)
+        assert self.end_tx_called
 
     @pytest.mark.parametrize(
         "mode, input_type, data, compress_data, exp_result", TEST_PARAMS
@@ -313,6 +287,7 @@ class TestFragmenterReassemblerThreaded:  # pylint: disable=too-many-instance-at
             end_rx=self.end_rx,
             remove_timer_entry=self.remove_timer_entry,
         )
+        self.frag_rule_ids = fragmentation_rule_ids(device_f)
         assert self.fragmenter.tx_state == pylibschc.fragmenter.TXState.INIT_TX
         assert self.fragmenter.rx_state == pylibschc.fragmenter.RXState.RECV_WINDOW
         assert self.reassembler.tx_state == pylibschc.fragmenter.TXState.INIT_TX
@@ -333,13 +308,120 @@ class TestFragmenterReassemblerThreaded:  # pylint: disable=too-many-instance-at
                             self.fragmenter.output(self.input_type(data)) == exp_result
                         )
                 self.reassemble()
-                pkt = self.reassembler_queue.get(timeout=(DUTY_CYCLE_MS / 1000) * 10)
+                pkt = self.reassembler_queue.get(timeout=REASSEMBLY_TIMEOUT)
                 if compress_data:
                     assert c_r.input(pkt, pylibschc.rules.Direction.DOWN) == data
                 else:
                     assert pkt == data
         self.fragmenter.unregister_send()
 
+    def test_fragmenter_output_error(self, test_rules):
+        config = test_rules.deploy()
+        self.fragmenter = pylibschc.fragmenter.FragmenterReassembler(
+            device=config.devices[0],
+            post_timer_task=self.post_timer_task,
+            end_tx=self.end_tx,
+            remove_timer_entry=self.remove_timer_entry,
+        )
+        self.fragmenter.register_send(self.send_frag)
+        # no mode set
+        with pytest.raises(TypeError):
+            self.fragmenter.output(b"foobar")
+        self.fragmenter.mode = pylibschc.fragmenter.FragmentationMode.NO_ACK
+        results = []
+        # output from another thread must not block on a stale lock
+        thread = threading.Thread(
+            target=lambda: results.append(self.fragmenter.output(b"foobar")),
+            daemon=True,
+        )
+        thread.start()
+        thread.join(timeout=SEND_TIMEOUT)
+        assert not thread.is_alive()
+        assert results == [pylibschc.fragmenter.FragmentationResult.NO_FRAGMENTATION]
+        self.fragmenter.unregister_send()
+
+    def test_fragmenter_reassembler_input_batch(self, test_rules):
+        config = test_rules.deploy()
+        data = LOREM
+        self.fragmenter = pylibschc.fragmenter.FragmenterReassembler(
+            device=config.devices[0],
+            mode=pylibschc.fragmenter.FragmentationMode.NO_ACK,
+            post_timer_task=self.post_timer_task,
+            end_tx=self.end_tx,
+            remove_timer_entry=self.remove_timer_entry,
+        )
+        self.reassembler = pylibschc.fragmenter.FragmenterReassembler(
+            device=config.devices[1],
+            post_timer_task=self.post_timer_task,
+            end_rx=self.end_rx,
+            remove_timer_entry=self.remove_timer_entry,
+        )
+        self.fragmenter.register_send(self.send_frag)
+        self.reassembler.register_send(self.send_ack)
+        with self.timer_lock:
+            assert (
+                self.fragmenter.output(data)
+                == pylibschc.fragmenter.FragmentationResult.SUCCESS
+            )
+        frames = []
+        try:
+            while True:
+                cmd = self.send_queue.get(timeout=SEND_TIMEOUT)
+                assert cmd["cmd"] == "frag"
+                frames.append(cmd["data"])
+        except queue.Empty:
+            assert self.end_tx_called
+        assert len(frames) > 1
+        with self.timer_lock:
+            res = self.reassembler.input_batch(frames)
+        assert res == [pylibschc.fragmenter.ReassemblyStatus.ONGOING] * (
+            len(frames) - 1
+        ) + [pylibschc.fragmenter.ReassemblyStatus.COMPLETED]
+        assert self.reassembler_queue.get(timeout=REASSEMBLY_TIMEOUT) == data
+        self.fragmenter.unregister_send()
+
+    def test_fragmenter_reassembler_device_changed(self, test_rules):
+        config = test_rules.deploy()
+        rx_device_ids = []
+
+        def end_rx(conn: pylibschc.fragmenter.FragmentationConnection):
+            rx_device_ids.append(conn.device_id)
+            self.end_rx(conn)
+
+        self.fragmenter = pylibschc.fragmenter.FragmenterReassembler(
+            device=config.devices[0],
+            mode=pylibschc.fragmenter.FragmentationMode.NO_ACK,
+            post_timer_task=self.post_timer_task,
+            end_tx=self.end_tx,
+            remove_timer_entry=self.remove_timer_entry,
+        )
+        self.reassembler = pylibschc.fragmenter.FragmenterReassembler(
+            device=config.devices[1],
+            post_timer_task=self.post_timer_task,
+            end_rx=end_rx,
+            remove_timer_entry=self.remove_timer_entry,
+        )
+        self.input_type = bytes
+        self.frag_rule_ids = fragmentation_rule_ids(config.devices[0])
+        self.fragmenter.register_send(self.send_frag)
+        self.reassembler.register_send(self.send_ack)
+        for device in (config.devices[1], config.devices[0]):
+            # the device is changed between two receptions
+            self.reassembler.device = device
+            self.end_tx_called = False
+            with self.timer_lock:
+                assert (
+                    self.fragmenter.output(LOREM)
+                    == pylibschc.fragmenter.FragmentationResult.SUCCESS
+                )
+            self.reassemble()
+            assert self.reassembler_queue.get(timeout=REASSEMBLY_TIMEOUT) == LOREM
+        assert rx_device_ids == [
+            config.devices[1].device_id,
+            config.devices[0].device_id,
+        ]
+        self.fragmenter.unregister_send()
+
 
 class TestFragmenterReassemblerAsync:  # pylint: disable=too-many-instance-attributes
     # pylint: disable=attribute-defined-outside-init
@@ -389,32 +471,27 @@ class TestFragmenterReassemblerAsync:  # pylint: disable=too-many-instance-attri
             self.timer_tasks.pop(conn)
 
     async def reassemble(self):
-        async def inp(handler, buffer):
-            return handler.input(buffer)
-
         while True:
-            cmd = await asyncio.wait_for(
-                self.send_queue.get(), timeout=5 * (DUTY_CYCLE_MS / 1000)
-            )
+            try:
+                cmd = self.send_queue.get_nowait()
+            except asyncio.QueueEmpty:
+                cmd = await asyncio.wait_for(
+                    self.send_queue.get(), timeout=SEND_TIMEOUT
+                )
             if cmd["cmd"] == "end_tx":
                 break
             assert cmd["cmd"] in ["frag", "ack"]
             buffer = cmd["data"]
-            is_fragmented = False
-            for rule in self.fragmenter.device.fragmentation_rules:
-                assert rule.rule_id_size_bits == 8
-                if rule.rule_id == buffer[0]:
-                    is_fragmented = True
-            if is_fragmented:
+            if buffer[0] in self.frag_rule_ids:
                 if cmd["cmd"] == "ack":
                     was_awaiting_ack = self.fragmenter.is_awaiting_ack()
                     # is an ACK, handle at fragmenter
-                    res = await inp(self.fragmenter, self.input_type(buffer))
+                    res = self.fragmenter.input(self.input_type(buffer))
                     if was_awaiting_ack:  # pragma: no cover
                         assert res == pylibschc.fragmenter.ReassemblyStatus.ACK_HANDLED
                 else:
                     # otherwise handle at reassembler
-                    res = await inp(self.reassembler, self.input_type(buffer))
+                    res = self.reassembler.input(self.input_type(buffer))
                     assert res in (
                         pylibschc.fragmenter.ReassemblyStatus.STAY_ALIVE,
                         pylibschc.fragmenter.ReassemblyStatus.COMPLETED,
@@ -422,20 +499,26 @@ class TestFragmenterReassemblerAsync:  # pylint: disable=too-many-instance-attri
                     )
             else:
                 # otherwise handle at reassembler
-                res = await inp(self.reassembler, self.input_type(buffer))
+                res = self.reassembler.input(self.input_type(buffer))
                 assert res == pylibschc.fragmenter.ReassemblyStatus.COMPLETED
 
     @pytest.mark.asyncio
+    @pytest.mark.parametrize("single_threaded", [False, True])
     @pytest.mark.parametrize(
         "mode, input_type, data, compress_data, exp_result", TEST_PARAMS
     )
     async def test_fragmenter_reassembler_async(  # pylint: disable=too-many-arguments
-        self, test_rules, mode, input_type, data, compress_data, exp_result, subtests
+        self,
+        test_rules,
+        mode,
+        input_type,
+        data,
+        compress_data,
+        exp_result,
+        single_threaded,
+        subtests,
     ):
         # pylint: disable=too-many-locals
-        async def output(buffer):
-            return self.fragmenter.output(buffer)
-
         self.loop = asyncio.get_running_loop()
         config = test_rules.deploy()
         device_f = config.devices[0]
@@ -450,13 +533,16 @@ class TestFragmenterReassemblerAsync:  # pylint: disable=too-many-instance-attri
             post_timer_task=self.post_timer_task,
             end_tx=self.end_tx,
             remove_timer_entry=self.remove_timer_entry,
+            single_threaded=single_threaded,
         )
         self.reassembler = pylibschc.fragmenter.FragmenterReassembler(
             device=device_r,
             post_timer_task=self.post_timer_task,
             end_rx=self.end_rx,
             remove_timer_entry=self.remove_timer_entry,
+            single_threaded=single_threaded,
         )
+        self.frag_rule_ids = fragmentation_rule_ids(device_f)
         assert self.fragmenter.tx_state == pylibschc.fragmenter.TXState.INIT_TX
         assert self.fragmenter.rx_state == pylibschc.fragmenter.RXState.RECV_WINDOW
         assert self.reassembler.tx_state == pylibschc.fragmenter.TXState.INIT_TX
@@ -471,12 +557,12 @@ class TestFragmenterReassemblerAsync:  # pylint: disable=too-many-instance-attri
                         self.input_type(data), direction=pylibschc.rules.Direction.DOWN
                     )
                     assert res == pylibschc.compressor.CompressionResult.COMPRESSED
-                    assert await output(pkt) == exp_result
+                    assert self.fragmenter.output(pkt) == exp_result
                 else:
-                    assert await output(self.input_type(data)) == exp_result
+                    assert self.fragmenter.output(self.input_type(data)) == exp_result
                 await self.reassemble()
                 pkt = await asyncio.wait_for(
-                    self.reassembly_buffer, timeout=(DUTY_CYCLE_MS / 1000) * 10
+                    self.reassembly_buffer, timeout=REASSEMBLY_TIMEOUT
                 )
                 if compress_data:
                     assert (